@@ -33,29 +33,52 @@ Sphinx directives for showing license information.
 
 # stdlib
 import os
+import re
+import tarfile
 import textwrap
+import zipfile
 from typing import Any, Dict, Iterable, List, Optional, Tuple, cast
 
 # 3rd party
 import docutils.nodes
-from dist_meta.distributions import Distribution, get_distribution
+from dist_meta.distributions import Distribution
 from docutils.parsers.rst import directives
 from docutils.statemachine import StringList
 from domdf_python_tools.compat import importlib_resources
 from domdf_python_tools.paths import PathPlus
 from pychoosealicense import description as description_utils
-from pychoosealicense import get_license
 from pychoosealicense.rules import Rule
 from sphinx import addnodes
 from sphinx.application import Sphinx
 from sphinx.builders import Builder
 from sphinx.builders.html import StandaloneHTMLBuilder
+from sphinx.config import Config
 from sphinx.util.docutils import ReferenceRole, SphinxDirective
 from sphinx.writers.html5 import HTML5Translator
 from sphinx_toolbox.utils import Purger
 
 # this package
 from sphinx_licenseinfo import nodes
+from sphinx_licenseinfo.archives import open_sdist, open_wheel, read_sdist_licenses, read_wheel_licenses
+from sphinx_licenseinfo.cache import get_cache, get_cached_license
+from sphinx_licenseinfo.identify import identify_license
+from sphinx_licenseinfo.license_index import collect_index_pages, merge_index, purge_index, record_distribution
+from sphinx_licenseinfo.manifest import (
+		_manifest_enabled,
+		merge_manifest,
+		purge_manifest,
+		record_distribution_licenses,
+		record_license,
+		write_manifest
+		)
+from sphinx_licenseinfo.utils import (
+		_get_search_path,
+		_license_id_from_metadata,
+		find_distribution,
+		get_license_id,
+		iter_licenses,
+		read_distribution_licenses
+		)
 
 __author__: str = "Dominic Davis-Foster"
 __copyright__: str = "2021 Dominic Davis-Foster"
@@ -77,15 +100,24 @@ class LicenseDirective(SphinxDirective):
 	"""
 	Directive for showing a license.
 
-	The license can be taken from a Python package's metadata,
+	The license can be taken from a Python package's metadata, from a wheel or sdist,
 	or from a filename relative to the Sphinx source directory.
 	"""
 
 	option_spec = {
 			"py": directives.unchanged_required,  # from python .dist-info
 			"file": directives.unchanged_required,  # from the file, relative to Sphinx srcdir
+			"identify": directives.flag,  # show the license-info for the license matching the text
+			"wheel": directives.unchanged_required,  # from a wheel, relative to Sphinx srcdir
+			"sdist": directives.unchanged_required,  # from an sdist, relative to Sphinx srcdir
+			"all": directives.flag,  # show all license files for the distribution
+			"site-packages": directives.unchanged_required,  # where to find the :py: distribution
+			"venv": directives.unchanged_required,  # virtualenv containing the :py: distribution
 			}
 
+	#: The options which specify where to obtain the license text from.
+	source_options = ("py", "file", "wheel", "sdist")
+
 	def run(self) -> List[docutils.nodes.Node]:
 		"""
 		Process the content of the directive.
@@ -93,53 +125,215 @@ class LicenseDirective(SphinxDirective):
 
 		output: List[docutils.nodes.Node] = []
 
-		if len(self.options) != 1:
-			return self.problematic(f"'.. license::' requires exactly one option, got {len(self.options)}")
+		num_sources = len([option for option in self.options if option in self.source_options])
+		if num_sources != 1:
+			return self.problematic(f"'.. license::' requires exactly one option, got {num_sources}")
+
+		elif ("site-packages" in self.options or "venv" in self.options) and "py" not in self.options:
+			return self.problematic("The ':site-packages:' and ':venv:' options can only be used with ':py:'")
 
 		elif "py" in self.options:
-			distro: Distribution = get_distribution(self.options["py"])
+			try:
+				distro: Distribution = self.get_distribution(self.options["py"])
+			except FileNotFoundError as e:
+				return self.problematic(str(e))
+
+			if self.config.licenseinfo_index_pages:
+				record_distribution(self.env, distro)
 
-			license_files = list(f.name for f in distro.path.glob("LICEN[CS]E*"))
-			licenses_dir = distro.path / "licenses"
-			if licenses_dir.is_dir():
-				license_files.extend(f"licenses/{f}" for f in os.listdir(licenses_dir))
-			license_files = sorted(f for f in license_files if distro.path.joinpath(f).is_file())
+			declared, licenses = self.read_distribution_licenses(distro)
 
-			if not license_files:
+			if not licenses:
 				return self.problematic(
 						f"No 'LICENSE' file (or similar) found "
 						f"for distribution {distro.name!r} version {distro.version}"
 						)
 
-			if len(license_files) > 1:
-				self.state.reporter.warning(
-						f"Found more than one file matching the pattern 'LICEN[CS]E*' "
-						f"for distribution {distro.name!r} version {distro.version}\n"
-						f"({license_files!r})\n"
-						f"Using the first one.",
-						line=self.lineno,
+			license_texts = self.select_licenses(distro.name, str(distro.version), declared, licenses)
+
+			if _manifest_enabled(self.config):
+				record_distribution_licenses(
+						self.env,
+						distro.name,
+						str(distro.version),
+						get_license_id(distro),
+						license_texts,
+						)
+
+		elif "wheel" in self.options or "sdist" in self.options:
+			archive = PathPlus(self.env.srcdir) / (self.options.get("wheel") or self.options["sdist"])
+			self.env.note_dependency(os.fspath(archive))
+
+			try:
+				if "wheel" in self.options:
+					archive_licenses = read_wheel_licenses(archive)
+				else:
+					archive_licenses = read_sdist_licenses(archive)
+			except FileNotFoundError as e:
+				return self.problematic(str(e))
+			except (tarfile.TarError, zipfile.BadZipFile) as e:
+				return self.problematic(f"Unable to read {archive.name!r}: {e}")
+
+			if not archive_licenses.licenses:
+				return self.problematic(
+						f"No 'LICENSE' file (or similar) found "
+						f"for distribution {archive_licenses.name!r} version {archive_licenses.version}"
 						)
 
-			license_text = distro.read_file(next(iter(license_files)))
+			license_texts = self.select_licenses(*archive_licenses)
+
+			if _manifest_enabled(self.config):
+				if "wheel" in self.options:
+					metadata = open_wheel(archive).get_metadata()
+				else:
+					metadata = open_sdist(archive).get_metadata()
+
+				record_distribution_licenses(
+						self.env,
+						archive_licenses.name,
+						archive_licenses.version,
+						_license_id_from_metadata(metadata),
+						license_texts,
+						)
 
 		elif "file" in self.options:
 			src_dir = PathPlus(self.env.srcdir)
 			license_file = src_dir / self.options["file"]
-			license_text = license_file.read_text()
+			license_texts = [(self.options["file"], license_file.read_text())]
 
 		else:  # pragma: no cover
 			# Should never occur
 			output.extend(self.problematic(f"Unknown option to '.. license::': {next(iter(self.options))}"))
 			return output
 
-		content = [".. code-block:: none", '']
-		content.extend(textwrap.indent(license_text, "    ").split('\n'))
+		for filename, license_text in license_texts:
+			content = [".. code-block:: none"]
+			if "all" in self.options:
+				content.append(f"    :caption: {filename}")
+			content.append('')
+			content.extend(textwrap.indent(license_text, "    ").split('\n'))
+
+			license_node = docutils.nodes.paragraph(rawsource='\n'.join(content))
+			self.state.nested_parse(StringList(content), self.content_offset, license_node)
+			output.append(license_node)
+
+			if "identify" in self.options:
+				output.extend(self.identify(license_text))
 
-		license_node = docutils.nodes.paragraph(rawsource='\n'.join(content))
-		self.state.nested_parse(StringList(content), self.content_offset, license_node)
-		output.append(license_node)
 		return output
 
+	def select_licenses(
+			self,
+			name: str,
+			version: str,
+			declared: bool,
+			licenses: List[Tuple[str, str]],
+			) -> List[Tuple[str, str]]:
+		"""
+		Returns the license files to show.
+
+		If there is more than one, and the ``:all:`` option was not given,
+		a warning is emitted and only the first is used.
+
+		:param name: The name of the distribution.
+		:param version: The version of the distribution.
+		:param declared: Whether the license files were declared with ``License-File`` metadata.
+		:param licenses: ``(filename, text)`` tuples for each license file.
+
+		.. versionadded:: 0.7.0
+		"""
+
+		if "all" in self.options or len(licenses) == 1:
+			return licenses
+
+		license_files = [filename for filename, _ in licenses]
+
+		if declared:
+			self.state.reporter.warning(
+					f"Distribution {name!r} version {version} "
+					f"declares more than one license file\n"
+					f"({license_files!r})\n"
+					f"Using the first one. Use the ':all:' option to show all of them.",
+					line=self.lineno,
+					)
+		else:
+			self.state.reporter.warning(
+					f"Found more than one file matching the pattern 'LICEN[CS]E*' "
+					f"for distribution {name!r} version {version}\n"
+					f"({license_files!r})\n"
+					f"Using the first one.",
+					line=self.lineno,
+					)
+
+		return licenses[:1]
+
+	def get_distribution(self, name: str) -> Distribution:
+		"""
+		Returns the distribution for the :rst:dir:`license:py` option.
+
+		The distribution is looked for in the :rst:dir:`license:site-packages` or :rst:dir:`license:venv`
+		directory if given, then in the :confval:`licenseinfo_site_packages` directories if set,
+		and otherwise on :py:data:`sys.path`.
+
+		:param name:
+
+		:raises dist_meta.distributions.DistributionNotFoundError: If the distribution cannot be found.
+		:raises FileNotFoundError: If the virtual environment has no ``site-packages`` directory.
+
+		.. versionadded:: 0.7.0
+		"""
+
+		path = _get_search_path(
+				self.env.srcdir,
+				self.env.app.confdir,
+				self.config.licenseinfo_site_packages,
+				site_packages=self.options.get("site-packages"),
+				venv=self.options.get("venv"),
+				)
+
+		return find_distribution(name, path)
+
+	def read_distribution_licenses(self, distro: Distribution) -> Tuple[bool, List[Tuple[str, str]]]:
+		"""
+		Returns the filenames and content of the license files for the given distribution.
+
+		The files declared with ``License-File`` metadata are used if present,
+		otherwise files in the ``.dist-info`` directory named like ``LICENSE*`` are used.
+
+		:param distro:
+
+		:returns: Whether the files were declared in the metadata,
+			and a list of ``(filename, text)`` tuples.
+
+		.. versionadded:: 0.7.0
+		"""
+
+		return read_distribution_licenses(distro, get_cache(self.config))
+
+	def identify(self, license_text: str) -> List[docutils.nodes.Node]:
+		"""
+		Identify the license from its text and return the nodes for its :rst:dir:`license-info`.
+
+		:param license_text:
+
+		.. versionadded:: 0.7.0
+		"""
+
+		the_license = identify_license(license_text, threshold=self.config.licenseinfo_identify_threshold)
+
+		if the_license is None:
+			self.state.reporter.warning("Unable to identify the license from its text.", line=self.lineno)
+			return []
+
+		info_node = docutils.nodes.container()
+		self.state.nested_parse(
+				StringList([f".. license-info:: {the_license.spdx_id}"]),
+				self.content_offset,
+				info_node,
+				)
+
+		return info_node.children
+
 	def problematic(self, message: str) -> List[docutils.nodes.Node]:  # docutils.nodes.Node
 		"""
 		Reports an error while processing the directive.
@@ -166,7 +360,10 @@ class LicenseInfoDirective(SphinxDirective):
 		Process the content of the directive.
 		"""
 
-		the_license = get_license(self.arguments[0])
+		the_license = get_cached_license(self.arguments[0], get_cache(self.config))
+
+		if _manifest_enabled(self.config):
+			record_license(self.env, the_license)
 
 		license_node = nodes.license_info(license=the_license)
 		license_node += nodes.custom_transition()
@@ -224,6 +421,13 @@ class ChooseALicenseRole(ReferenceRole):
 	target: Optional[str]  # type: ignore[assignment]
 	has_explicit_title: Optional[bool]  # type: ignore[assignment]
 
+	def __call__(self, *args, **kwargs) -> Tuple[List[docutils.nodes.Node], List[docutils.nodes.system_message]]:
+		try:
+			return super().__call__(*args, **kwargs)
+		finally:
+			# The role instance is registered globally, so don't keep the last document it was used in alive.
+			self.inliner = None  # type: ignore[assignment]
+
 	def run(self) -> Tuple[List[docutils.nodes.Node], List[docutils.nodes.system_message]]:
 		"""
 		Process the role.
@@ -233,7 +437,7 @@ class ChooseALicenseRole(ReferenceRole):
 		assert self.target is not None
 		assert self.inliner is not None
 
-		the_license = get_license(self.target)
+		the_license = get_cached_license(self.target, get_cache(self.config))
 
 		self.target = the_license.spdx_id
 
@@ -284,6 +488,13 @@ def copy_asset_files(app: Sphinx, exception: Optional[Exception] = None) -> None
 		with importlib_resources.open_binary("sphinx_licenseinfo", filename) as fp2:
 			(css_dir / filename).write_bytes(fp2.read())
 
+	if app.config.licenseinfo_lazy:
+		js_dir = static_dir / "js"
+		js_dir.maybe_make()
+
+		with importlib_resources.open_text("sphinx_licenseinfo", "license_info.js") as fp:
+			(js_dir / "license_info.js").write_text(fp.read())
+
 
 def _configure(app: Sphinx) -> None:
 
@@ -321,6 +532,29 @@ def _configure(app: Sphinx) -> None:
 		app.add_node(nodes.custom_transition, **kwargs)  # type: ignore[arg-type]
 
 
+def _configure_cache_dir(app: Sphinx, config: Config) -> None:
+	# Like the other paths in conf.py, a relative cache directory is relative to the configuration directory.
+	if config.licenseinfo_cache_dir:
+		config.licenseinfo_cache_dir = os.path.join(app.confdir, config.licenseinfo_cache_dir)
+
+
+def _configure_lazy(app: Sphinx, config: Config) -> None:
+	if config.licenseinfo_lazy:
+		app.add_js_file("js/license_info.js", defer="defer")
+
+
+def _configure_linkcheck(app: Sphinx, config: Config) -> None:
+	# The links to choosealicense.com are made from the bundled catalogue, so are known to exist
+	# without asking the server. Links to licenses not in the catalogue are still checked.
+	# This is done for every builder as older versions of Sphinx read linkcheck_ignore before builder-inited.
+
+	spdx_ids = '|'.join(re.escape(the_license.spdx_id.lower()) for the_license in iter_licenses())
+	config.linkcheck_ignore = [
+			*config.linkcheck_ignore,
+			rf"^https://choosealicense\.com/licenses/(?:{spdx_ids})/$",
+			]
+
+
 def setup(app: Sphinx) -> Dict[str, Any]:
 	"""
 	Setup :mod:`sphinx_licenseinfo`.
@@ -330,11 +564,14 @@ def setup(app: Sphinx) -> Dict[str, Any]:
 
 	# this package
 	from sphinx_licenseinfo.translators import (
+			add_rules_legend,
 			depart_flushright_text,
 			depart_license_info,
 			visit_flushright_text,
-			visit_license_info
+			visit_license_info,
+			visit_license_info_latex
 			)
+	from sphinx_licenseinfo.validate import validate_references
 
 	app.setup_extension("sphinx_toolbox.formatting")
 
@@ -342,15 +579,42 @@ def setup(app: Sphinx) -> Dict[str, Any]:
 	app.add_directive("license-info", LicenseInfoDirective)
 	app.add_role("choosealicense", ChooseALicenseRole())
 
+	app.add_config_value("licenseinfo_cache_dir", None, '', types=[str])
+	app.add_config_value("licenseinfo_cache_size", 50 * 1024 * 1024, '', types=[int])
+	app.add_config_value("licenseinfo_identify_threshold", 0.5, "env", types=[float])
+	app.add_config_value("licenseinfo_index_pages", False, "env", types=[bool])
+	app.add_config_value("licenseinfo_index_prefix", "license-index", "html", types=[str])
+	app.add_config_value("licenseinfo_template", None, "html", types=[str])
+	app.add_config_value("licenseinfo_validate", None, '', types=[bool, str])
+	app.add_config_value("licenseinfo_manifest", False, "env", types=[bool])
+	app.add_config_value("licenseinfo_lazy", False, "env", types=[bool])
+	app.add_config_value("licenseinfo_compact", False, "html", types=[bool])
+	app.add_config_value("licenseinfo_site_packages", None, "env", types=[str, list])
+
+	app.connect("config-inited", _configure_cache_dir)
+	app.connect("config-inited", _configure_linkcheck)
+	app.connect("config-inited", _configure_lazy)
 	app.connect("builder-inited", _configure)
+	app.connect("env-before-read-docs", validate_references)
 	app.connect("env-purge-doc", license_node_purger.purge_nodes)
 	app.connect("env-get-outdated", license_node_purger.get_outdated_docnames)
+	app.connect("env-purge-doc", purge_index)
+	app.connect("env-merge-info", merge_index)
+	app.connect("env-purge-doc", purge_manifest)
+	app.connect("env-merge-info", merge_manifest)
+	app.connect("html-collect-pages", collect_index_pages)
+	app.connect("html-page-context", add_rules_legend)
 	app.connect("build-finished", copy_asset_files)
+	app.connect("build-finished", write_manifest)
 
 	app.add_css_file("css/license_info.css")
 
 	app.add_node(nodes.flushright_text, latex=(visit_flushright_text, depart_flushright_text))
-	app.add_node(nodes.license_info, html=(visit_license_info, depart_license_info))
+	app.add_node(
+			nodes.license_info,
+			html=(visit_license_info, depart_license_info),
+			latex=(visit_license_info_latex, depart_license_info),
+			)
 
 	return {
 			"version": __version__,
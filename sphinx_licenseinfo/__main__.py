@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+#
+#  __main__.py
+"""
+Generate a license report for the distributions in a Python environment.
+
+.. versionadded:: 0.7.0
+"""
+#
+#  Copyright © 2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import os
+import sys
+from typing import Optional, Tuple
+
+# 3rd party
+import click  # nodep
+
+__all__ = ["main"]
+
+
+@click.option("--identify", is_flag=True, default=False, help="Identify unknown licenses from their text.")
+@click.option(
+		"-j",
+		"--jobs",
+		type=click.INT,
+		default=None,
+		help="The number of distributions to read in parallel.",
+		)
+@click.option(
+		"--cache-dir",
+		type=click.STRING,
+		default=None,
+		help="Directory to cache license information in. Defaults to $SPHINX_LICENSEINFO_CACHE_DIR.",
+		)
+@click.option("--disallow-unknown", is_flag=True, default=False, help="Fail if a license cannot be determined.")
+@click.option("--disallow-copyleft", is_flag=True, default=False, help="Fail if a copyleft license is used.")
+@click.option(
+		"--disallow",
+		type=click.STRING,
+		multiple=True,
+		metavar="SPDX",
+		help="Fail if the license with this SPDX identifier is used. May be given multiple times.",
+		)
+@click.option("-o", "--output", type=click.STRING, default=None, help="Write the report to this file.")
+@click.option(
+		"-f",
+		"--format",
+		"fmt",
+		type=click.Choice(["text", "json", "html"]),
+		default="text",
+		show_default=True,
+		help="The format of the report.",
+		)
+@click.option(
+		"-p",
+		"--path",
+		type=click.STRING,
+		multiple=True,
+		help="Directory to search for distributions in, instead of sys.path. May be given multiple times.",
+		)
+@click.option(
+		"-r",
+		"--requirements",
+		type=click.STRING,
+		multiple=True,
+		help="Report on the distributions in this requirements file. May be given multiple times.",
+		)
+@click.argument("distributions", nargs=-1)
+@click.command(context_settings={"help_option_names": ["-h", "--help"]})
+def main(
+		distributions: Tuple[str, ...],
+		requirements: Tuple[str, ...] = (),
+		path: Tuple[str, ...] = (),
+		fmt: str = "text",
+		output: Optional[str] = None,
+		disallow: Tuple[str, ...] = (),
+		disallow_copyleft: bool = False,
+		disallow_unknown: bool = False,
+		cache_dir: Optional[str] = None,
+		jobs: Optional[int] = None,
+		identify: bool = False,
+		) -> None:
+	"""
+	Show the licenses of the given distributions.
+
+	If no distributions or requirements files are given all installed distributions are included.
+
+	Exits with a non-zero status if a disallowed license is used or a distribution cannot be found.
+	"""
+
+	# this package
+	from sphinx_licenseinfo.cache import CACHE_DIR_ENV_VAR, LicenseCache
+	from sphinx_licenseinfo.report import check_licenses, format_html, format_json, format_text, gather_report
+	from sphinx_licenseinfo.report import read_requirement_names
+
+	names = list(distributions)
+	for requirements_file in requirements:
+		names.extend(read_requirement_names(requirements_file))
+
+	cache_dir = cache_dir or os.environ.get(CACHE_DIR_ENV_VAR)
+	cache = LicenseCache(cache_dir) if cache_dir else None
+
+	report = gather_report(
+			names=names if (distributions or requirements) else None,
+			path=path or None,
+			cache=cache,
+			identify=identify,
+			jobs=jobs,
+			)
+	violations = check_licenses(report, disallow, disallow_copyleft, disallow_unknown)
+
+	formatter = {"text": format_text, "json": format_json, "html": format_html}[fmt]
+	formatted = formatter(report, violations)
+
+	if output is None:
+		click.echo(formatted)
+	else:
+		with open(output, 'w', encoding="UTF-8") as fp:
+			fp.write(formatted)
+			fp.write('\n')
+
+	if violations or report.missing:
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+#
+#  archives.py
+"""
+Read license files directly from wheels and sdists, without unpacking them.
+
+.. versionadded:: 0.7.0
+"""
+#
+#  Copyright © 2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import fnmatch
+import functools
+import os
+import posixpath
+import tarfile
+import zipfile
+from typing import Dict, List, NamedTuple, Tuple, Union
+
+# 3rd party
+import dist_meta.metadata
+from dist_meta.distributions import WheelDistribution
+from dist_meta.metadata_mapping import MetadataMapping
+from domdf_python_tools.typing import PathLike
+
+# this package
+from sphinx_licenseinfo.utils import get_declared_license_files
+
+__all__ = [
+		"ArchiveLicenses",
+		"Sdist",
+		"Wheel",
+		"open_sdist",
+		"open_wheel",
+		"read_sdist_licenses",
+		"read_wheel_licenses",
+		]
+
+_license_patterns = ("LICEN[CS]E*", "licenses/*")
+
+
+class ArchiveLicenses(NamedTuple):
+	"""
+	The license files in a wheel or sdist.
+	"""
+
+	#: The name of the distribution.
+	name: str
+
+	#: The version of the distribution.
+	version: str
+
+	#: Whether the license files were declared with ``License-File`` metadata.
+	declared: bool
+
+	#: ``(filename, text)`` tuples for each license file.
+	licenses: List[Tuple[str, str]]
+
+
+class Sdist:
+	"""
+	A source distribution (``.tar.gz`` or ``.zip``), with an index of its members.
+
+	The archive is read once, when the object is created, and is then closed, so no file handles are kept open.
+	``PKG-INFO`` and files which look like license files are read at the same time.
+	Other files are read by :meth:`~.read_text`, which opens the archive again.
+	As a ``.tar.gz`` file can only be read from the start, this means decompressing it again.
+
+	:param filename: The path to the sdist.
+	"""
+
+	def __init__(self, filename: PathLike):
+		self.filename = os.fspath(filename)
+
+		#: Mapping of filenames, relative to the top-level directory of the sdist, to their names in the archive.
+		self.members: Dict[str, str] = {}
+
+		self._contents: Dict[str, bytes] = {}
+
+		with self._open() as archive:
+			if isinstance(archive, zipfile.ZipFile):
+				for info in archive.infolist():
+					if not info.is_dir() and self._add_member(info.filename):
+						self._contents[self._relative_name(info.filename)] = archive.read(info)
+			else:
+				# Iterating reads the members in order, so each wanted file is read without seeking back.
+				for info in archive:
+					if info.isfile() and self._add_member(info.name):
+						fp = archive.extractfile(info)
+						assert fp is not None
+						self._contents[self._relative_name(info.name)] = fp.read()
+
+	def _open(self) -> Union[tarfile.TarFile, zipfile.ZipFile]:
+		if zipfile.is_zipfile(self.filename):
+			return zipfile.ZipFile(self.filename)
+		else:
+			return tarfile.open(self.filename)  # pylint: disable=consider-using-with
+
+	@staticmethod
+	def _relative_name(name: str) -> str:
+		# Strip the top-level {name}-{version} directory.
+		return name.partition('/')[2]
+
+	def _add_member(self, name: str) -> bool:
+		# Returns whether the file should be read while the archive is open.
+		relative_name = self._relative_name(name)
+		if not relative_name:
+			return False
+
+		self.members[relative_name] = name
+		return relative_name == "PKG-INFO" or bool(_match_license_files([relative_name]))
+
+	def read_text(self, filename: str) -> str:
+		"""
+		Returns the content of the given file from the sdist.
+
+		:param filename: The filename, relative to the top-level directory of the sdist.
+
+		:raises FileNotFoundError: If the file is not in the sdist.
+		"""
+
+		if filename not in self.members:
+			raise FileNotFoundError(f"{filename!r} not found in {self.filename!r}")
+
+		if filename not in self._contents:
+			with self._open() as archive:
+				if isinstance(archive, zipfile.ZipFile):
+					data = archive.read(self.members[filename])
+				else:
+					fp = archive.extractfile(self.members[filename])
+					assert fp is not None
+					data = fp.read()
+
+			self._contents[filename] = data
+
+		return self._contents[filename].decode("UTF-8")
+
+	def get_metadata(self) -> MetadataMapping:
+		"""
+		Returns the content of the sdist's ``PKG-INFO`` file.
+		"""
+
+		return dist_meta.metadata.loads(self.read_text("PKG-INFO"))
+
+
+class Wheel:
+	"""
+	The metadata and license files of a wheel.
+
+	These are read when the object is created, and the wheel is then closed, so no file handles are kept open.
+
+	:param filename: The path to the wheel.
+	"""
+
+	def __init__(self, filename: PathLike):
+		self.filename = os.fspath(filename)
+
+		with WheelDistribution.from_path(self.filename) as wheel:
+			#: The content of the wheel's ``METADATA`` file.
+			self.metadata: MetadataMapping = wheel.get_metadata()
+
+			license_files = get_declared_license_files(wheel)
+			declared = bool(license_files)
+
+			if not declared:
+				dist_info = f"{wheel.name}-{wheel.version}.dist-info/"
+				names = [
+						name[len(dist_info):] for name in wheel.wheel_zip.namelist()
+						if name.lower().startswith(dist_info.lower())
+						]
+				license_files = _match_license_files(names)
+
+			#: The license files in the wheel's ``.dist-info`` directory.
+			self.licenses = ArchiveLicenses(
+					wheel.name,
+					str(wheel.version),
+					declared,
+					[(license_file, wheel.read_file(license_file)) for license_file in license_files],
+					)
+
+	def get_metadata(self) -> MetadataMapping:
+		"""
+		Returns the content of the wheel's ``METADATA`` file.
+		"""
+
+		return self.metadata
+
+
+@functools.lru_cache(maxsize=64)
+def _open_wheel(filename: str, mtime_ns: int) -> Wheel:
+	return Wheel(filename)
+
+
+@functools.lru_cache(maxsize=64)
+def _open_sdist(filename: str, mtime_ns: int) -> Sdist:
+	return Sdist(filename)
+
+
+def open_wheel(filename: PathLike) -> Wheel:
+	"""
+	Read the metadata and license files from the given wheel.
+
+	Wheels are cached by path and modification time, so each wheel is only read once.
+
+	:param filename:
+	"""
+
+	filename = os.path.abspath(filename)
+	return _open_wheel(filename, os.stat(filename).st_mtime_ns)
+
+
+def open_sdist(filename: PathLike) -> Sdist:
+	"""
+	Open the given sdist.
+
+	Sdists are cached by path and modification time,
+	so the index of each sdist is only read once.
+
+	:param filename:
+	"""
+
+	filename = os.path.abspath(filename)
+	return _open_sdist(filename, os.stat(filename).st_mtime_ns)
+
+
+def _match_license_files(filenames: List[str]) -> List[str]:
+	return sorted(
+			filename for filename in filenames
+			if any(fnmatch.fnmatchcase(filename, pattern) for pattern in _license_patterns)
+			and '/' not in filename.partition("licenses/")[2]
+			)
+
+
+def read_wheel_licenses(filename: PathLike) -> ArchiveLicenses:
+	"""
+	Returns the license files from the ``.dist-info`` directory of the given wheel.
+
+	The files declared with ``License-File`` metadata are used if present,
+	otherwise files in the ``.dist-info`` directory named like ``LICENSE*`` are used.
+
+	:param filename:
+	"""
+
+	return open_wheel(filename).licenses
+
+
+def read_sdist_licenses(filename: PathLike) -> ArchiveLicenses:
+	"""
+	Returns the license files from the given sdist.
+
+	The files declared with ``License-File`` metadata in ``PKG-INFO`` are used if present,
+	otherwise files in the top-level directory named like ``LICENSE*`` are used.
+
+	:param filename:
+	"""
+
+	sdist = open_sdist(filename)
+	metadata = sdist.get_metadata()
+
+	license_files = [
+			license_file for license_file in metadata.get_all("License-File", default=[])
+			if license_file in sdist.members
+			]
+	declared = bool(license_files)
+
+	if not declared:
+		license_files = _match_license_files(list(sdist.members))
+
+	licenses = [(license_file, sdist.read_text(license_file)) for license_file in license_files]
+	return ArchiveLicenses(metadata["Name"], metadata["Version"], declared, licenses)
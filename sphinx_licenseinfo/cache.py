@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+#
+#  cache.py
+"""
+On-disk cache of license data, which may be shared between Sphinx projects.
+
+.. versionadded:: 0.7.0
+"""
+#
+#  Copyright © 2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import contextlib
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Iterator, Optional
+
+# 3rd party
+import pychoosealicense
+from domdf_python_tools.paths import PathPlus
+from domdf_python_tools.typing import PathLike
+from pychoosealicense import License, get_license
+from pychoosealicense.rules import Rule
+
+__all__ = ["CACHE_DIR_ENV_VAR", "LicenseCache", "get_cache", "get_cached_license", "get_fragment_cache"]
+
+#: The environment variable which may be used to set the cache directory
+#: instead of :confval:`licenseinfo_cache_dir`.
+CACHE_DIR_ENV_VAR = "SPHINX_LICENSEINFO_CACHE_DIR"
+
+
+class LicenseCache:
+	"""
+	A directory of cached license texts, choosealicense.com metadata and rendered HTML.
+
+	Entries are keyed by a hash of their inputs and the version of :mod:`sphinx_licenseinfo`,
+	so a single directory can safely be shared by many projects and processes.
+	Writes are made atomically, and eviction is guarded by a lock file.
+	When the total size of the cache exceeds ``max_size`` the least recently used entries are removed.
+
+	:param directory: The cache directory. Created if it does not exist.
+	:param max_size: The maximum size of the cache, in bytes.
+	"""
+
+	#: The amount of time, in seconds, after which a lock file is considered to have been abandoned.
+	lock_timeout: float = 30
+
+	def __init__(self, directory: PathLike, max_size: int = 50 * 1024 * 1024):
+		self.directory = PathPlus(directory).abspath()
+		self.max_size = int(max_size)
+		self.directory.maybe_make(parents=True)
+
+		# Approximate size of the cache, updated as entries are written by this process.
+		self._size: Optional[int] = None
+
+	@staticmethod
+	def make_key(*parts: str) -> str:
+		r"""
+		Construct a cache key from the given values and the version of :mod:`sphinx_licenseinfo`.
+
+		:param \*parts:
+		"""
+
+		# this package
+		from sphinx_licenseinfo import __version__
+
+		sha = hashlib.sha256(__version__.encode("UTF-8"))
+		for part in parts:
+			sha.update(b'\0')
+			sha.update(part.encode("UTF-8"))
+
+		return sha.hexdigest()
+
+	def _entry(self, namespace: str, key: str) -> PathPlus:
+		return self.directory / namespace / key[:2] / key
+
+	def get(self, namespace: str, key: str) -> Optional[str]:
+		"""
+		Returns the cached value for ``key``, or :py:obj:`None` if it is not in the cache.
+
+		:param namespace: The kind of data being retrieved, e.g. ``'html'``.
+		:param key: The key returned by :meth:`~.make_key`.
+		"""
+
+		entry = self._entry(namespace, key)
+
+		try:
+			value = entry.read_text(encoding="UTF-8")
+		except (FileNotFoundError, NotADirectoryError):
+			return None
+
+		with contextlib.suppress(OSError):
+			# Mark the entry as recently used.
+			os.utime(entry)
+
+		return value
+
+	def set(self, namespace: str, key: str, value: str) -> None:  # noqa: A003  # pylint: disable=redefined-builtin
+		"""
+		Store ``value`` in the cache.
+
+		The value is written to a temporary file which is then moved into place,
+		so concurrent readers never see a partially written entry.
+
+		:param namespace: The kind of data being stored, e.g. ``'html'``.
+		:param key: The key returned by :meth:`~.make_key`.
+		:param value:
+		"""
+
+		entry = self._entry(namespace, key)
+		entry.parent.maybe_make(parents=True)
+
+		try:
+			old_size = entry.stat().st_size
+		except FileNotFoundError:
+			old_size = 0
+
+		fd, tmp_filename = tempfile.mkstemp(dir=entry.parent, prefix=".tmp-")
+		try:
+			with os.fdopen(fd, 'w', encoding="UTF-8") as fp:
+				fp.write(value)
+			new_size = os.stat(tmp_filename).st_size
+			os.replace(tmp_filename, entry)
+		except BaseException:
+			with contextlib.suppress(OSError):
+				os.unlink(tmp_filename)
+			raise
+
+		if self._size is None:
+			self._size = self.size()
+		else:
+			self._size += new_size - old_size
+
+		if self._size > self.max_size:
+			self.evict()
+
+	def get_json(self, namespace: str, key: str) -> Any:
+		"""
+		Returns the cached JSON value for ``key``, or :py:obj:`None` if it is not in the cache.
+
+		:param namespace: The kind of data being retrieved.
+		:param key: The key returned by :meth:`~.make_key`.
+		"""
+
+		value = self.get(namespace, key)
+		if value is None:
+			return None
+
+		try:
+			return json.loads(value)
+		except ValueError:  # pragma: no cover
+			return None
+
+	def set_json(self, namespace: str, key: str, value: Any) -> None:
+		"""
+		Store ``value`` in the cache as JSON.
+
+		:param namespace: The kind of data being stored.
+		:param key: The key returned by :meth:`~.make_key`.
+		:param value:
+		"""
+
+		self.set(namespace, key, json.dumps(value))
+
+	@contextlib.contextmanager
+	def lock(self) -> Iterator[None]:
+		"""
+		Context manager to hold the cache's lock file, waiting for other processes to release it.
+		"""
+
+		lock_file = self.directory / ".lock"
+
+		while True:
+			try:
+				fd = os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+			except FileExistsError:
+				with contextlib.suppress(OSError):
+					if time.time() - lock_file.stat().st_mtime > self.lock_timeout:
+						# The process holding the lock probably died.
+						lock_file.unlink()
+						continue
+				time.sleep(0.01)
+			else:
+				break
+
+		try:
+			os.close(fd)
+			yield
+		finally:
+			with contextlib.suppress(OSError):
+				lock_file.unlink()
+
+	def size(self) -> int:
+		"""
+		Returns the total size of the cache entries, in bytes.
+		"""
+
+		total_size = 0
+
+		for entry in self._iter_entries():
+			with contextlib.suppress(FileNotFoundError):
+				total_size += entry.stat().st_size
+
+		return total_size
+
+	def _iter_entries(self) -> Iterator[PathPlus]:
+		for dirpath, _, filenames in os.walk(self.directory):
+			for filename in filenames:
+				if not filename.startswith('.'):
+					yield PathPlus(dirpath, filename)
+
+	def evict(self) -> None:
+		"""
+		Remove the least recently used entries until the cache is no larger than :attr:`~.max_size`.
+		"""
+
+		entries = []
+		total_size = 0
+
+		for entry in self._iter_entries():
+			with contextlib.suppress(FileNotFoundError):
+				stat = entry.stat()
+				entries.append((stat.st_mtime, stat.st_size, entry))
+				total_size += stat.st_size
+
+		if total_size > self.max_size:
+			with self.lock():
+				for _, size, entry in sorted(entries, key=lambda e: e[0]):
+					if total_size <= self.max_size:
+						break
+
+					with contextlib.suppress(FileNotFoundError):
+						entry.unlink()
+
+					total_size -= size
+
+		self._size = total_size
+
+
+@functools.lru_cache()
+def _get_cache(directory: str, max_size: int) -> LicenseCache:
+	return LicenseCache(directory, max_size)
+
+
+def get_cache(config: Any) -> Optional[LicenseCache]:
+	"""
+	Returns the :class:`~.LicenseCache` for the given Sphinx configuration,
+	or :py:obj:`None` if caching is not enabled.
+
+	The cache directory is taken from :confval:`licenseinfo_cache_dir`,
+	falling back to the :envvar:`SPHINX_LICENSEINFO_CACHE_DIR` environment variable.
+	A relative :confval:`licenseinfo_cache_dir` has already been made absolute (relative to the
+	configuration directory) when the configuration was loaded; a relative environment variable
+	is relative to the current working directory.
+
+	:param config: The Sphinx configuration.
+	:type config: :class:`sphinx.config.Config`
+	"""
+
+	directory = getattr(config, "licenseinfo_cache_dir", None) or os.environ.get(CACHE_DIR_ENV_VAR)
+
+	if not directory:
+		return None
+
+	return _get_cache(os.fspath(directory), config.licenseinfo_cache_size)
+
+
+def get_fragment_cache(builder: Any) -> LicenseCache:
+	"""
+	Returns the :class:`~.LicenseCache` used to store rendered license fragments for the given builder.
+
+	This is the cache from :func:`~.get_cache` if one is configured.
+	Otherwise a cache in the ``licenseinfo`` subdirectory of the doctree directory is used,
+	which is shared by all builders using that doctree directory (e.g. ``html``, ``dirhtml`` and ``epub``).
+
+	:param builder: The Sphinx builder.
+	:type builder: :class:`sphinx.builders.Builder`
+	"""
+
+	cache = get_cache(builder.config)
+
+	if cache is None:
+		directory = os.path.join(builder.doctreedir, "licenseinfo")
+		cache = _get_cache(directory, builder.config.licenseinfo_cache_size)
+
+	return cache
+
+
+def get_cached_license(identifier: str, cache: Optional[LicenseCache]) -> License:
+	"""
+	Return the license text and metadata for the given identifier, using the cache if possible.
+
+	:param identifier: The license's SPDX identifier.
+	:param cache:
+
+	:raises ValueError: If the license is unknown.
+	"""
+
+	if cache is None:
+		return get_license(identifier)
+
+	key = cache.make_key(identifier.lower(), pychoosealicense.__version__)
+	data = cache.get_json("choosealicense", key)
+
+	if data is not None:
+		for field in ("conditions", "permissions", "limitations"):
+			data[field] = tuple(Rule(*rule) for rule in data[field])
+		return License(**data)
+
+	the_license = get_license(identifier)
+
+	data = the_license._asdict()
+	for field in ("conditions", "permissions", "limitations"):
+		data[field] = [list(rule) for rule in data[field]]
+
+	cache.set_json("choosealicense", key, data)
+
+	return the_license
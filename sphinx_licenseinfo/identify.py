@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+#
+#  identify.py
+"""
+Identify a license from its text by comparing it with the choosealicense.com catalogue.
+
+.. versionadded:: 0.7.0
+"""
+#
+#  Copyright © 2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import functools
+import re
+import zlib
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+# 3rd party
+from pychoosealicense import License
+
+# this package
+from sphinx_licenseinfo.utils import iter_licenses
+
+__all__ = ["SHINGLE_SIZE", "FingerprintIndex", "fingerprint", "get_fingerprint_index", "identify_license"]
+
+_field_re = re.compile(r"\{(fullname|login|email|project|description|year|projecturl)}")
+_word_re = re.compile(r"[a-z0-9]+")
+
+#: The number of consecutive words in each shingle.
+SHINGLE_SIZE = 5
+
+
+def fingerprint(text: str) -> FrozenSet[int]:
+	"""
+	Returns the fingerprint of a license text.
+
+	The text is normalised by lowercasing it and removing punctuation, whitespace
+	and the placeholders used in choosealicense.com templates.
+	The fingerprint is the set of hashes of each run of :data:`~.SHINGLE_SIZE` consecutive words.
+
+	:param text:
+	"""
+
+	text = _field_re.sub(' ', text).lower().replace("licence", "license")
+	words = _word_re.findall(text)
+
+	return frozenset(
+			zlib.crc32(' '.join(words[idx:idx + SHINGLE_SIZE]).encode("UTF-8"))
+			for idx in range(max(1, len(words) - SHINGLE_SIZE + 1))
+			)
+
+
+class FingerprintIndex:
+	"""
+	An index of the fingerprints of license texts, for finding the license most similar to a given text.
+
+	:param licenses: The licenses to index.
+	"""
+
+	def __init__(self, licenses: Tuple[License, ...]):
+		self.licenses: Dict[str, License] = {}
+		self.sizes: Dict[str, int] = {}
+		self.shingles: Dict[int, List[str]] = {}
+
+		for the_license in licenses:
+			the_fingerprint = fingerprint(the_license.content)
+			self.licenses[the_license.spdx_id] = the_license
+			self.sizes[the_license.spdx_id] = len(the_fingerprint)
+
+			for shingle in the_fingerprint:
+				self.shingles.setdefault(shingle, []).append(the_license.spdx_id)
+
+	def classify(self, text: str) -> List[Tuple[float, License]]:
+		"""
+		Returns the licenses which share any text with ``text``,
+		and their similarity to it, from most to least similar.
+
+		The similarity is the Jaccard index of the two fingerprints,
+		between ``0`` (nothing in common) and ``1`` (identical).
+
+		:param text:
+		"""
+
+		text_fingerprint = fingerprint(text)
+		overlaps: Dict[str, int] = {}
+
+		for shingle in text_fingerprint:
+			for spdx_id in self.shingles.get(shingle, ()):
+				overlaps[spdx_id] = overlaps.get(spdx_id, 0) + 1
+
+		results = []
+		for spdx_id, overlap in overlaps.items():
+			similarity = overlap / (len(text_fingerprint) + self.sizes[spdx_id] - overlap)
+			results.append((similarity, self.licenses[spdx_id]))
+
+		return sorted(results, key=lambda result: result[0], reverse=True)
+
+
+@functools.lru_cache(1)
+def get_fingerprint_index() -> FingerprintIndex:
+	"""
+	Returns the :class:`~.FingerprintIndex` of the choosealicense.com catalogue.
+
+	The index is built the first time this function is called, and reused thereafter.
+	"""
+
+	return FingerprintIndex(iter_licenses())
+
+
+def identify_license(text: str, threshold: float = 0.5) -> Optional[License]:
+	"""
+	Returns the license in the choosealicense.com catalogue which ``text`` is an instance of,
+	or :py:obj:`None` if no license is sufficiently similar.
+
+	:param text:
+	:param threshold: The minimum similarity, between ``0`` and ``1``.
+	"""
+
+	results = get_fingerprint_index().classify(text)
+
+	if results and results[0][0] >= threshold:
+		return results[0][1]
+
+	return None
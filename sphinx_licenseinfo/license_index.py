@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+#
+#  license_index.py
+"""
+Generated pages listing the documented Python distributions by license.
+
+.. versionadded:: 0.7.0
+"""
+#
+#  Copyright © 2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import hashlib
+import html
+import json
+from typing import Any, Dict, Iterator, List, Set, Tuple
+
+# 3rd party
+from dist_meta.distributions import DistributionType
+from domdf_python_tools.paths import PathPlus
+from pychoosealicense import License
+from sphinx.application import Sphinx
+from sphinx.builders.html import StandaloneHTMLBuilder
+from sphinx.environment import CONFIG_OK, BuildEnvironment
+from sphinx.util.osutil import SEP
+
+# this package
+from sphinx_licenseinfo.cache import get_cache, get_cached_license
+from sphinx_licenseinfo.utils import _license_id_from_metadata, is_copyleft
+
+__all__ = [
+		"LicenseIndex",
+		"UNKNOWN",
+		"collect_index_pages",
+		"get_license_index",
+		"merge_index",
+		"purge_index",
+		"record_distribution",
+		]
+
+#: Type hint for the index of distributions and documents by license.
+LicenseIndex = Dict[str, Dict[str, Set[str]]]
+
+#: The SPDX identifier used for distributions whose license could not be determined.
+UNKNOWN = "unknown"
+
+
+def get_license_index(env: BuildEnvironment) -> LicenseIndex:
+	"""
+	Returns the mapping of SPDX identifiers to distribution names to the documents they are shown in.
+
+	:param env: The Sphinx build environment.
+	"""
+
+	if not hasattr(env, "licenseinfo_index"):
+		env.licenseinfo_index = {}  # type: ignore[attr-defined]
+
+	return env.licenseinfo_index  # type: ignore[attr-defined]
+
+
+def record_distribution(env: BuildEnvironment, distro: DistributionType) -> None:
+	"""
+	Record that the license of ``distro`` is shown in the current document.
+
+	:param env: The Sphinx build environment.
+	:param distro:
+	"""
+
+	metadata = distro.get_metadata()
+	spdx_id = _license_id_from_metadata(metadata) or UNKNOWN
+	name = metadata.get("Name", distro.name)
+
+	index = get_license_index(env)
+	index.setdefault(spdx_id, {}).setdefault(name, set()).add(env.docname)
+
+
+def purge_index(app: Sphinx, env: BuildEnvironment, docname: str) -> None:
+	"""
+	Remove the entries for ``docname`` from the index.
+
+	:param app: The Sphinx application.
+	:param env: The Sphinx build environment.
+	:param docname: The name of the document being purged.
+	"""
+
+	index = get_license_index(env)
+
+	for spdx_id in list(index):
+		distributions = index[spdx_id]
+
+		for name in list(distributions):
+			distributions[name].discard(docname)
+			if not distributions[name]:
+				del distributions[name]
+
+		if not distributions:
+			del index[spdx_id]
+
+
+def merge_index(app: Sphinx, env: BuildEnvironment, docnames: Set[str], other: BuildEnvironment) -> None:
+	"""
+	Merge the index from a parallel read subprocess into the main environment.
+
+	:param app: The Sphinx application.
+	:param env: The Sphinx build environment.
+	:param docnames: The names of the documents read by the subprocess.
+	:param other: The build environment from the subprocess.
+	"""
+
+	index = get_license_index(env)
+
+	for spdx_id, distributions in get_license_index(other).items():
+		for name, other_docnames in distributions.items():
+			index.setdefault(spdx_id, {}).setdefault(name, set()).update(other_docnames & docnames)
+
+
+def _render_distributions(
+		builder: StandaloneHTMLBuilder,
+		pagename: str,
+		distributions: Dict[str, Set[str]],
+		) -> List[str]:
+
+	body = ["<ul>"]
+
+	for name in sorted(distributions, key=str.lower):
+		links = []
+
+		for docname in sorted(distributions[name]):
+			if docname in builder.env.titles:
+				doc_title = html.escape(builder.env.titles[docname].astext())
+			else:
+				doc_title = html.escape(docname)
+
+			links.append(f'<a href="{builder.get_relative_uri(pagename, docname)}">{doc_title}</a>')
+
+		body.append(f"<li><strong>{html.escape(name)}</strong> &#8212; {', '.join(links)}</li>")
+
+	body.append("</ul>")
+
+	return body
+
+
+def _iter_pages(app: Sphinx) -> Iterator[Tuple[str, str, List[str]]]:
+	builder: StandaloneHTMLBuilder = app.builder  # type: ignore[assignment]
+	prefix = app.config.licenseinfo_index_prefix
+	index = get_license_index(app.env)
+	cache = get_cache(app.config)
+
+	licenses: Dict[str, License] = {}
+	for spdx_id in index:
+		if spdx_id != UNKNOWN:
+			licenses[spdx_id] = get_cached_license(spdx_id, cache)
+
+	index_pagename = f"{prefix}{SEP}index"
+	copyleft_pagename = f"{prefix}{SEP}copyleft"
+
+	copyleft_uri = builder.get_relative_uri(index_pagename, copyleft_pagename)
+	body = [
+			"<h1>Packages by license</h1>",
+			f'<p><a href="{copyleft_uri}">All copyleft dependencies</a></p>',
+			"<ul>",
+			]
+
+	for spdx_id in sorted(index, key=str.lower):
+		pagename = f"{prefix}{SEP}{spdx_id.lower()}"
+		title = html.escape(licenses[spdx_id].title) if spdx_id in licenses else "Unknown license"
+		body.append(
+				f'<li><a href="{builder.get_relative_uri(index_pagename, pagename)}">{title}</a> '
+				f"({len(index[spdx_id])})</li>"
+				)
+
+	body.append("</ul>")
+	yield index_pagename, "Packages by license", body
+
+	copyleft_body = ["<h1>All copyleft dependencies</h1>"]
+
+	for spdx_id in sorted(licenses, key=str.lower):
+		if is_copyleft(licenses[spdx_id]):
+			copyleft_body.append(f"<h2>{html.escape(licenses[spdx_id].title)}</h2>")
+			copyleft_body.extend(_render_distributions(builder, copyleft_pagename, index[spdx_id]))
+
+	yield copyleft_pagename, "All copyleft dependencies", copyleft_body
+
+	for spdx_id, distributions in index.items():
+		pagename = f"{prefix}{SEP}{spdx_id.lower()}"
+
+		if spdx_id in licenses:
+			title = f"All packages under the {licenses[spdx_id].title}"
+		else:
+			title = "Packages with an unknown license"
+
+		body = [f"<h1>{html.escape(title)}</h1>", *_render_distributions(builder, pagename, distributions)]
+		yield pagename, title, body
+
+
+def collect_index_pages(app: Sphinx) -> Iterator[Tuple[str, Dict[str, Any], str]]:
+	"""
+	Generate the "packages by license" pages, if :confval:`licenseinfo_index_pages` is enabled.
+
+	Pages whose content has not changed since the previous build are not written again,
+	unless the configuration (e.g. the theme or sidebars) has changed or the environment is new.
+
+	:param app: The Sphinx application.
+	"""
+
+	if not app.config.licenseinfo_index_pages:
+		return
+
+	builder: StandaloneHTMLBuilder = app.builder  # type: ignore[assignment]
+	hashes_file = PathPlus(app.doctreedir) / "licenseinfo_index.json"
+
+	try:
+		all_hashes = json.loads(hashes_file.read_text())
+	except (FileNotFoundError, ValueError):
+		all_hashes = {}
+
+	if app.env.config_status == CONFIG_OK:
+		previous_hashes = all_hashes.get(builder.name, {})
+	else:
+		# Every page is written if the configuration has changed or the environment is new (e.g. with -E).
+		previous_hashes = {}
+
+	# The rest of the page (theme, sidebars, navigation etc.) depends on the HTML configuration.
+	build_info = getattr(builder, "build_info", None)
+	context_hash = f"{build_info.config_hash}{build_info.tags_hash}" if build_info is not None else ''
+
+	hashes = {}
+
+	for pagename, title, body in _iter_pages(app):
+		content = '\n'.join(body)
+		page_hash = hashlib.sha256(f"{context_hash}\n{content}".encode("UTF-8")).hexdigest()
+		hashes[pagename] = page_hash
+
+		if previous_hashes.get(pagename) == page_hash and PathPlus(builder.get_outfilename(pagename)).is_file():
+			continue
+
+		yield pagename, {"title": title, "body": content}, "page.html"
+
+	all_hashes[builder.name] = hashes
+	hashes_file.write_clean(json.dumps(all_hashes))
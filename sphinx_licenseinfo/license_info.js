@@ -0,0 +1,119 @@
+/*
+ * Loads the details of license-info blocks from licenses.json when they are scrolled into view.
+ *
+ * Used when "licenseinfo_lazy" is enabled. If the manifest cannot be loaded
+ * the placeholder, which links to choosealicense.com, is left as it is.
+ */
+
+(function () {
+	"use strict";
+
+	var manifests = {};
+
+	function loadManifest(url) {
+		if (!(url in manifests)) {
+			manifests[url] = fetch(url).then(function (response) {
+				if (!response.ok) {
+					throw new Error(response.statusText);
+				}
+				return response.json();
+			});
+		}
+		return manifests[url];
+	}
+
+	function element(tag, attributes, text) {
+		var node = document.createElement(tag);
+		Object.keys(attributes).forEach(function (name) {
+			node.setAttribute(name, attributes[name]);
+		});
+		if (text !== undefined) {
+			node.textContent = text;
+		}
+		return node;
+	}
+
+	function rulesList(className, rules, title) {
+		var list = element("ul", title ? {"class": className, "title": title} : {"class": className});
+		rules.forEach(function (rule) {
+			var item = element("li", {"class": rule.tag, "title": rule.description});
+			item.appendChild(element("span", {"class": "license-sprite"}));
+			item.appendChild(element("span", {"class": "rule-name"}, rule.label));
+			list.appendChild(item);
+		});
+		return list;
+	}
+
+	function render(placeholder, license) {
+		var description = element("p", {});
+		description.innerHTML = license.description;
+
+		var table = element("table", {"class": "license-rules"});
+		var tbody = table.appendChild(element("tbody", {}));
+		var headings = tbody.appendChild(element("tr", {}));
+		var cells = tbody.appendChild(element("tr", {}));
+
+		[
+			["Permissions", rulesList("license-permissions", license.permissions)],
+			["Conditions", rulesList("license-conditions", license.conditions)],
+			[
+				"Limitations",
+				rulesList(
+					"license-limitations",
+					license.limitations,
+					"This license includes a limitation of liability."
+				)
+			]
+		].forEach(function (column) {
+			headings.appendChild(element("th", {"class": "label"}, column[0]));
+			cells.appendChild(element("td", {})).appendChild(column[1]);
+		});
+
+		var details = element("div", {"class": "license-details"});
+		details.appendChild(table);
+
+		var seeMore = element("div", {"class": "see-more-wrapper"});
+		seeMore.appendChild(element("a", {"class": "see-more", "href": license.url}, "See more information on choosealicense.com ➩"));
+		details.appendChild(seeMore);
+
+		placeholder.textContent = "";
+		placeholder.appendChild(description);
+		placeholder.appendChild(details);
+		placeholder.classList.remove("license-info-lazy");
+	}
+
+	function load(placeholder) {
+		loadManifest(placeholder.dataset.manifest).then(function (manifest) {
+			var license = manifest.licenses[placeholder.dataset.license];
+			if (license) {
+				render(placeholder, license);
+			}
+		}).catch(function () {});
+	}
+
+	function init() {
+		var placeholders = Array.prototype.slice.call(document.querySelectorAll(".license-info-lazy"));
+
+		if ("IntersectionObserver" in window) {
+			var observer = new IntersectionObserver(function (entries) {
+				entries.forEach(function (entry) {
+					if (entry.isIntersecting) {
+						observer.unobserve(entry.target);
+						load(entry.target);
+					}
+				});
+			}, {rootMargin: "200px"});
+			placeholders.forEach(function (placeholder) {
+				observer.observe(placeholder);
+			});
+		} else {
+			placeholders.forEach(load);
+		}
+	}
+
+	if (document.readyState === "loading") {
+		document.addEventListener("DOMContentLoaded", init);
+	} else {
+		init();
+	}
+})();
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+#
+#  manifest.py
+"""
+A machine-readable manifest of the licenses and distributions shown in the documentation.
+
+.. versionadded:: 0.7.0
+"""
+#
+#  Copyright © 2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# 3rd party
+import pychoosealicense.description
+from domdf_python_tools.paths import PathPlus
+from pychoosealicense import License
+from pychoosealicense.rules import Rule
+from sphinx.application import Sphinx
+from sphinx.builders import Builder
+from sphinx.environment import BuildEnvironment
+
+# this package
+from sphinx_licenseinfo.cache import get_cache, get_cached_license
+
+__all__ = [
+		"MANIFEST_FILENAME",
+		"ManifestData",
+		"get_manifest_data",
+		"make_manifest",
+		"merge_manifest",
+		"purge_manifest",
+		"record_distribution_licenses",
+		"record_license",
+		"write_manifest",
+		]
+
+#: The name of the manifest file, relative to the output directory.
+MANIFEST_FILENAME = "licenses.json"
+
+#: Type hint for the licenses and distributions recorded in the build environment.
+#:
+#: ``licenses`` maps SPDX identifiers to the documents they are shown in.
+#: ``distributions`` maps ``name==version`` to the distribution's details,
+#: including the ``documents`` it is shown in.
+ManifestData = Dict[str, Dict[str, Any]]
+
+
+def _manifest_enabled(config: Any) -> bool:
+	return bool(config.licenseinfo_manifest or config.licenseinfo_lazy)
+
+
+def _sha256(text: str) -> str:
+	return hashlib.sha256(text.encode("UTF-8")).hexdigest()
+
+
+def get_manifest_data(env: BuildEnvironment) -> ManifestData:
+	"""
+	Returns the licenses and distributions recorded for the manifest.
+
+	:param env: The Sphinx build environment.
+	"""
+
+	if not hasattr(env, "licenseinfo_manifest"):
+		env.licenseinfo_manifest = {"licenses": {}, "distributions": {}}  # type: ignore[attr-defined]
+
+	return env.licenseinfo_manifest  # type: ignore[attr-defined]
+
+
+def record_license(env: BuildEnvironment, the_license: License) -> None:
+	"""
+	Record that the :rst:dir:`license-info` for ``the_license`` is shown in the current document.
+
+	:param env: The Sphinx build environment.
+	:param the_license:
+	"""
+
+	get_manifest_data(env)["licenses"].setdefault(the_license.spdx_id, set()).add(env.docname)
+
+
+def record_distribution_licenses(
+		env: BuildEnvironment,
+		name: str,
+		version: str,
+		spdx_id: Optional[str],
+		licenses: List[Tuple[str, str]],
+		) -> None:
+	"""
+	Record that the license files of a distribution are shown in the current document.
+
+	:param env: The Sphinx build environment.
+	:param name: The name of the distribution.
+	:param version: The version of the distribution.
+	:param spdx_id: The SPDX identifier of the distribution's license, if known.
+	:param licenses: ``(filename, text)`` tuples for each license file shown.
+	"""
+
+	distributions = get_manifest_data(env)["distributions"]
+	entry = distributions.setdefault(
+			f"{name}=={version}",
+			{"name": name, "version": version, "license": spdx_id, "license_files": {}, "documents": set()},
+			)
+
+	entry["license_files"].update((filename, _sha256(text)) for filename, text in licenses)
+	entry["documents"].add(env.docname)
+
+
+def purge_manifest(app: Sphinx, env: BuildEnvironment, docname: str) -> None:
+	"""
+	Remove the entries for ``docname`` from the manifest data.
+
+	:param app: The Sphinx application.
+	:param env: The Sphinx build environment.
+	:param docname: The name of the document being purged.
+	"""
+
+	data = get_manifest_data(env)
+
+	licenses = data["licenses"]
+	for spdx_id in list(licenses):
+		licenses[spdx_id].discard(docname)
+		if not licenses[spdx_id]:
+			del licenses[spdx_id]
+
+	distributions = data["distributions"]
+	for key in list(distributions):
+		distributions[key]["documents"].discard(docname)
+		if not distributions[key]["documents"]:
+			del distributions[key]
+
+
+def merge_manifest(app: Sphinx, env: BuildEnvironment, docnames: Set[str], other: BuildEnvironment) -> None:
+	"""
+	Merge the manifest data from a parallel read subprocess into the main environment.
+
+	:param app: The Sphinx application.
+	:param env: The Sphinx build environment.
+	:param docnames: The names of the documents read by the subprocess.
+	:param other: The build environment from the subprocess.
+	"""
+
+	data = get_manifest_data(env)
+	other_data = get_manifest_data(other)
+
+	for spdx_id, other_docnames in other_data["licenses"].items():
+		data["licenses"].setdefault(spdx_id, set()).update(other_docnames & docnames)
+
+	for key, other_entry in other_data["distributions"].items():
+		entry = data["distributions"].setdefault(key, {**other_entry, "license_files": {}, "documents": set()})
+		entry["license_files"].update(other_entry["license_files"])
+		entry["documents"].update(other_entry["documents"] & docnames)
+
+
+def _rules(rules: List[Rule]) -> List[Dict[str, str]]:
+	return [{"tag": rule.tag, "label": rule.label, "description": rule.description} for rule in rules]
+
+
+def make_manifest(builder: Builder) -> Dict[str, Any]:
+	"""
+	Returns the manifest of the licenses and distributions shown in the documentation.
+
+	The manifest contains the details of each license shown with :rst:dir:`license-info`,
+	and of each distribution whose license files are shown with :rst:dir:`license`,
+	along with the documents they are shown in.
+
+	:param builder:
+	"""
+
+	data = get_manifest_data(builder.env)
+	cache = get_cache(builder.config)
+
+	def documents(docnames: Set[str]) -> List[Dict[str, str]]:
+		return [{"docname": docname, "uri": builder.get_target_uri(docname)} for docname in sorted(docnames)]
+
+	licenses = {}
+	for spdx_id, docnames in data["licenses"].items():
+		the_license = get_cached_license(spdx_id, cache)
+		licenses[spdx_id] = {
+				"spdx_id": the_license.spdx_id,
+				"title": the_license.title,
+				"url": f"https://choosealicense.com/licenses/{the_license.spdx_id.lower()}/",
+				"description": pychoosealicense.description.as_html(the_license.description),
+				"permissions": _rules(the_license.permissions),
+				"conditions": _rules(the_license.conditions),
+				"limitations": _rules(the_license.limitations),
+				"sha256": _sha256(the_license.content),
+				"documents": documents(docnames),
+				}
+
+	distributions = {}
+	for key, entry in data["distributions"].items():
+		distributions[key] = {**entry, "documents": documents(entry["documents"])}
+
+	return {"licenses": licenses, "distributions": distributions}
+
+
+def write_manifest(app: Sphinx, exception: Optional[Exception] = None) -> None:
+	"""
+	Write the manifest to :data:`~.MANIFEST_FILENAME` in the HTML output directory,
+	if :confval:`licenseinfo_manifest` or :confval:`licenseinfo_lazy` is enabled.
+
+	:param app: The Sphinx application.
+	:param exception: Any exception which occurred and caused Sphinx to abort.
+	"""
+
+	if exception:  # pragma: no cover
+		return
+
+	if not _manifest_enabled(app.config) or app.builder.format.lower() != "html":
+		return
+
+	manifest = json.dumps(make_manifest(app.builder), indent=2, sort_keys=True)
+	PathPlus(app.outdir, MANIFEST_FILENAME).write_clean(manifest)
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+#
+#  report.py
+"""
+Generate license reports for Python distributions without running Sphinx.
+
+.. versionadded:: 0.7.0
+"""
+#
+#  Copyright © 2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import functools
+import html
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Collection, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# 3rd party
+from dist_meta.distributions import Distribution, DistributionNotFoundError, get_distribution, iter_distributions
+from domdf_python_tools.compat import importlib_resources
+from domdf_python_tools.paths import PathPlus
+from domdf_python_tools.typing import PathLike
+from pychoosealicense import License
+from pychoosealicense.rules import Rule
+
+# this package
+from sphinx_licenseinfo.cache import LicenseCache, get_cached_license
+from sphinx_licenseinfo.identify import identify_license
+from sphinx_licenseinfo.utils import _normalize, get_license_id, is_copyleft, read_distribution_licenses
+
+__all__ = [
+		"DistributionReport",
+		"Report",
+		"check_licenses",
+		"format_html",
+		"format_json",
+		"format_text",
+		"gather_report",
+		"read_requirement_names",
+		"report_distribution",
+		]
+
+_requirement_name_re = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+
+class DistributionReport(NamedTuple):
+	"""
+	The license information for a single distribution.
+	"""
+
+	#: The name of the distribution.
+	name: str
+
+	#: The version of the distribution.
+	version: str
+
+	#: The SPDX identifier of the distribution's license, or :py:obj:`None` if it could not be determined.
+	license: Optional[str]  # noqa: A003  # pylint: disable=redefined-builtin
+
+	#: Whether the license files were declared with ``License-File`` metadata.
+	declared: bool
+
+	#: A list of ``(filename, text)`` tuples for the distribution's license files.
+	license_files: List[Tuple[str, str]]
+
+
+class Report(NamedTuple):
+	"""
+	The license information for a set of distributions.
+	"""
+
+	#: The distributions in the report, sorted by name.
+	distributions: List[DistributionReport]
+
+	#: Mapping of SPDX identifiers to licenses, for the licenses used by the distributions in the report.
+	licenses: Dict[str, License]
+
+	#: The names of requested distributions which could not be found.
+	missing: List[str]
+
+
+def read_requirement_names(filename: PathLike) -> List[str]:
+	"""
+	Returns the names of the distributions in the given requirements file.
+
+	Comments, blank lines and pip options (e.g. ``--index-url`` and ``-r``) are ignored,
+	as are any version specifiers, extras and environment markers.
+
+	:param filename:
+	"""
+
+	names = []
+
+	for line in PathPlus(filename).read_lines():
+		line = line.split('#', 1)[0].strip()
+		if not line or line.startswith('-'):
+			continue
+
+		match = _requirement_name_re.match(line)
+		if match:
+			names.append(match.group(1))
+
+	return names
+
+
+def report_distribution(
+		distro: Distribution,
+		cache: Optional[LicenseCache] = None,
+		identify: bool = False,
+		) -> DistributionReport:
+	"""
+	Returns the license information for the given distribution.
+
+	:param distro:
+	:param cache: An optional cache to store the license files in.
+	:param identify: If the license cannot be determined from the distribution's metadata,
+		try to identify it from the text of its first license file.
+	"""
+
+	declared, license_files = read_distribution_licenses(distro, cache)
+	license_id = get_license_id(distro)
+
+	if license_id is None and identify and license_files:
+		identified = identify_license(license_files[0][1])
+		if identified is not None:
+			license_id = identified.spdx_id
+
+	return DistributionReport(
+			name=distro.name,
+			version=str(distro.version),
+			license=license_id,
+			declared=declared,
+			license_files=license_files,
+			)
+
+
+def gather_report(
+		names: Optional[Iterable[str]] = None,
+		path: Optional[Iterable[PathLike]] = None,
+		cache: Optional[LicenseCache] = None,
+		identify: bool = False,
+		jobs: Optional[int] = None,
+		) -> Report:
+	"""
+	Gather the license information for the given distributions.
+
+	The distributions are read in parallel, as reading them is dominated by filesystem access.
+
+	:param names: The names of the distributions to report on.
+		If :py:obj:`None` all distributions on ``path`` are included.
+	:param path: The directories to search for distributions in. Defaults to :py:obj:`sys.path`.
+	:param cache: An optional cache to store the license files and licenses in.
+	:param identify: If the license cannot be determined from a distribution's metadata,
+		try to identify it from the text of its first license file.
+	:param jobs: The maximum number of threads to use.
+		Defaults to the :class:`~concurrent.futures.ThreadPoolExecutor` default.
+	"""
+
+	distributions: Dict[str, Distribution] = {}
+	missing = []
+
+	if names is None:
+		for distro in iter_distributions(path):
+			# Earlier entries on the path take precedence, as they would when importing.
+			distributions.setdefault(_normalize(distro.name), distro)
+	else:
+		for name in names:
+			if _normalize(name) in distributions:
+				continue
+			try:
+				distributions[_normalize(name)] = get_distribution(name, path)
+			except DistributionNotFoundError:
+				missing.append(name)
+
+	worker = functools.partial(report_distribution, cache=cache, identify=identify)
+	with ThreadPoolExecutor(max_workers=jobs) as executor:
+		reports = list(executor.map(worker, distributions.values()))
+
+	licenses = {}
+	for report in reports:
+		if report.license is not None and report.license not in licenses:
+			licenses[report.license] = get_cached_license(report.license, cache)
+
+	return Report(
+			distributions=sorted(reports, key=lambda r: _normalize(r.name)),
+			licenses=licenses,
+			missing=missing,
+			)
+
+
+def check_licenses(
+		report: Report,
+		disallow: Collection[str] = (),
+		disallow_copyleft: bool = False,
+		disallow_unknown: bool = False,
+		) -> List[Tuple[DistributionReport, str]]:
+	"""
+	Returns the distributions in the report whose licenses are not allowed,
+	as a list of ``(distribution, reason)`` tuples.
+
+	:param report:
+	:param disallow: SPDX identifiers of licenses which are not allowed. Case insensitive.
+	:param disallow_copyleft: Whether copyleft licenses are not allowed.
+	:param disallow_unknown: Whether distributions whose license could not be determined are not allowed.
+	"""
+
+	disallowed_ids = {spdx_id.lower() for spdx_id in disallow}
+	violations = []
+
+	for distribution in report.distributions:
+		if distribution.license is None:
+			if disallow_unknown:
+				violations.append((distribution, "license could not be determined"))
+		elif distribution.license.lower() in disallowed_ids:
+			violations.append((distribution, f"{distribution.license} is not allowed"))
+		elif disallow_copyleft and is_copyleft(report.licenses[distribution.license]):
+			violations.append((distribution, f"{distribution.license} is a copyleft license"))
+
+	return violations
+
+
+def _rules_as_dict(rules: Iterable[Rule]) -> List[Dict[str, str]]:
+	return [{"tag": rule.tag, "label": rule.label} for rule in rules]
+
+
+def format_json(report: Report, violations: Iterable[Tuple[DistributionReport, str]] = ()) -> str:
+	"""
+	Format the report as JSON.
+
+	:param report:
+	:param violations: The output of :func:`~.check_licenses`.
+	"""
+
+	data = {
+			"distributions": [
+					{
+							"name": distribution.name,
+							"version": distribution.version,
+							"license": distribution.license,
+							"declared": distribution.declared,
+							"license_files": [{"filename": f, "text": t} for f, t in distribution.license_files],
+							} for distribution in report.distributions
+					],
+			"licenses": {
+					spdx_id: {
+							"title": the_license.title,
+							"copyleft": is_copyleft(the_license),
+							"permissions": _rules_as_dict(the_license.permissions),
+							"conditions": _rules_as_dict(the_license.conditions),
+							"limitations": _rules_as_dict(the_license.limitations),
+							}
+					for spdx_id, the_license in report.licenses.items()
+					},
+			"missing": report.missing,
+			"violations": [{"name": distribution.name, "reason": reason} for distribution, reason in violations],
+			}
+
+	return json.dumps(data, indent=2)
+
+
+def format_text(report: Report, violations: Iterable[Tuple[DistributionReport, str]] = ()) -> str:
+	"""
+	Format the report as plain text, with one line per distribution.
+
+	:param report:
+	:param violations: The output of :func:`~.check_licenses`.
+	"""
+
+	lines = []
+
+	for distribution in report.distributions:
+		filenames = ", ".join(filename for filename, _ in distribution.license_files) or "no license files"
+		license_id = distribution.license or "unknown"
+		lines.append(f"{distribution.name} {distribution.version}: {license_id} ({filenames})")
+
+	for name in report.missing:
+		lines.append(f"{name}: distribution not found")
+
+	for distribution, reason in violations:
+		lines.append(f"Disallowed: {distribution.name} {distribution.version}: {reason}")
+
+	return '\n'.join(lines)
+
+
+def format_html(report: Report, violations: Iterable[Tuple[DistributionReport, str]] = ()) -> str:
+	"""
+	Format the report as a standalone HTML page.
+
+	The rules for each license are rendered with the same template as the :rst:dir:`license-info` directive.
+
+	:param report:
+	:param violations: The output of :func:`~.check_licenses`.
+	"""
+
+	# this package
+	from sphinx_licenseinfo.translators import _get_license_template, _render_license_info
+
+	_, license_template = _get_license_template()
+	stylesheet = importlib_resources.read_text("sphinx_licenseinfo", "license_info.css")
+
+	body = ["<h1>License report</h1>"]
+
+	violations = list(violations)
+	if violations or report.missing:
+		body.append('<ul class="license-report-problems">')
+		for distribution, reason in violations:
+			body.append(f"<li>{html.escape(distribution.name)}: {html.escape(reason)}</li>")
+		for name in report.missing:
+			body.append(f"<li>{html.escape(name)}: distribution not found</li>")
+		body.append("</ul>")
+
+	body.append("<h2>Licenses</h2>")
+	for spdx_id, the_license in report.licenses.items():
+		body.append(f'<h3 id="license-{html.escape(spdx_id.lower())}">{html.escape(the_license.title)}</h3>')
+		body.extend(_render_license_info(license_template, the_license))
+
+	body.append("<h2>Distributions</h2>")
+	for distribution in report.distributions:
+		body.append(f"<h3>{html.escape(distribution.name)} {html.escape(distribution.version)}</h3>")
+		if distribution.license is not None:
+			the_license = report.licenses[distribution.license]
+			href = f"#license-{html.escape(distribution.license.lower())}"
+			body.append(f'<p><a href="{href}">{html.escape(the_license.title)}</a></p>')
+		for filename, text in distribution.license_files:
+			body.append(f"<p><code>{html.escape(filename)}</code></p>")
+			body.append(f"<pre>{html.escape(text)}</pre>")
+
+	return '\n'.join([
+			"<!DOCTYPE html>",
+			"<html>",
+			"<head>",
+			'<meta charset="utf-8">',
+			"<title>License report</title>",
+			f"<style>{stylesheet}</style>",
+			"</head>",
+			"<body>",
+			*body,
+			"</body>",
+			"</html>",
+			])
@@ -26,19 +26,44 @@ Node visitors for custom nodes.
 #  OR OTHER DEALINGS IN THE SOFTWARE.
 #
 
+# stdlib
+import functools
+import hashlib
+import html
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
 # 3rd party
 import docutils.nodes
 import jinja2
+import pychoosealicense
 import pychoosealicense.description
 from domdf_python_tools.compat import importlib_resources
+from domdf_python_tools.paths import PathPlus
+from domdf_python_tools.typing import PathLike
+from pychoosealicense import License
+from pychoosealicense.rules import Rule
+from sphinx.application import Sphinx
 from sphinx.builders.latex.nodes import footnotetext
+from sphinx.util.osutil import relative_uri
 from sphinx.writers.html5 import HTML5Translator
 from sphinx.writers.latex import LaTeXTranslator
 
 # this package
 from sphinx_licenseinfo import nodes
+from sphinx_licenseinfo.cache import get_fragment_cache
+from sphinx_licenseinfo.manifest import MANIFEST_FILENAME
+
+__all__ = [
+		"visit_flushright_text",
+		"depart_flushright_text",
+		"visit_license_info",
+		"depart_license_info",
+		"visit_license_info_latex",
+		"add_rules_legend",
+		]
 
-__all__ = ["visit_flushright_text", "depart_flushright_text", "visit_license_info", "depart_license_info"]
+_rule_categories = ("permissions", "conditions", "limitations")
 
 
 def visit_flushright_text(translator: LaTeXTranslator, node: nodes.flushright_text) -> None:
@@ -93,25 +118,117 @@ def depart_flushright_text(translator: LaTeXTranslator, node: nodes.flushright_t
 	translator.body.append("\n\\end{flushright}\n")
 
 
+@functools.lru_cache()
+def _load_license_template(
+		filename: Optional[str],
+		mtime_ns: int,
+		default: str = "license_info.t.html",
+		) -> Tuple[str, jinja2.Template]:
+	if filename is None:
+		template_source = importlib_resources.read_text("sphinx_licenseinfo", default)
+	else:
+		template_source = PathPlus(filename).read_text()
+
+	license_template = jinja2.Environment(  # nosec: B701
+		loader=jinja2.BaseLoader(),
+		undefined=jinja2.StrictUndefined,
+		autoescape=jinja2.select_autoescape()
+		).from_string(template_source)
+
+	return hashlib.sha256(template_source.encode("UTF-8")).hexdigest(), license_template
+
+
+def _get_license_template(
+		filename: Optional[PathLike] = None,
+		default: str = "license_info.t.html",
+		) -> Tuple[str, jinja2.Template]:
+	# Returns the hash of the template source, and the template.
+	# The template is reloaded if the file is modified.
+	# ``default`` is the name of the built-in template to use if no filename is given.
+
+	if filename is None:
+		return _load_license_template(None, 0, default)
+
+	filename = os.path.abspath(filename)
+	return _load_license_template(filename, os.stat(filename).st_mtime_ns)
+
+
+def _render_license_info(license_template: jinja2.Template, the_license: License) -> List[str]:
+	the_description = pychoosealicense.description.as_html(the_license.description)
+	return license_template.render(license=the_license, description=the_description).split('\n')
+
+
+def _render_placeholder(translator: HTML5Translator, the_license: License) -> str:
+	# The details are filled in from the manifest by license_info.js
+	builder = translator.builder
+	manifest_uri = relative_uri(builder.get_target_uri(builder.current_docname), MANIFEST_FILENAME)
+	url = f"https://choosealicense.com/licenses/{the_license.spdx_id.lower()}/"
+
+	return (
+			f'<div class="license-info license-info-lazy" data-license="{html.escape(the_license.spdx_id)}" '
+			f'data-manifest="{html.escape(manifest_uri)}">\n'
+			f'<p><a class="see-more" href="{url}">{html.escape(the_license.title)}</a></p>\n'
+			"</div>"
+			)
+
+
 def visit_license_info(translator: HTML5Translator, node: nodes.license_info) -> None:
 	"""
 	Visit a :class:`~.license_info` node and generate HTML output.
 
+	If :confval:`licenseinfo_lazy` is enabled a placeholder is output instead,
+	which is filled in from the manifest when it is scrolled into view.
+
+	If :confval:`licenseinfo_compact` is enabled the rules are output without their descriptions,
+	which are instead listed once per page by :func:`~.add_rules_legend`.
+
 	:param translator:
 	:param node:
 	"""
 
-	template_source = importlib_resources.read_text("sphinx_licenseinfo", "license_info.t.html")
-	license_template = jinja2.Environment(  # nosec: B701
-		loader=jinja2.BaseLoader(),
-		undefined=jinja2.StrictUndefined,
-		autoescape=jinja2.select_autoescape()
-		).from_string(template_source)
+	builder = translator.builder
+	compact = builder.config.licenseinfo_compact
+
+	if builder.config.licenseinfo_lazy:
+		translator.body.append(_render_placeholder(translator, node.license))
+		raise docutils.nodes.SkipNode
 
-	the_description = pychoosealicense.description.as_html(node.license.description)
-	output = license_template.render(license=node.license, description=the_description).split('\n')
+	template_filename = None
+	if builder.config.licenseinfo_template:
+		template_filename = os.path.join(builder.confdir, builder.config.licenseinfo_template)
 
+	template_hash, license_template = _get_license_template(
+			template_filename,
+			"license_info_compact.t.html" if compact else "license_info.t.html",
+			)
+
+	# Rendered fragments are shared between HTML builders (e.g. html, dirhtml, singlehtml and epub)
+	cache = get_fragment_cache(builder)
+	key = cache.make_key("license_info", node.license.spdx_id, pychoosealicense.__version__, template_hash)
+	cached = cache.get("html", key)
+
+	if cached is None:
+		output = _render_license_info(license_template, node.license)
+		cache.set("html", key, '\n'.join(output))
+	else:
+		output = cached.split('\n')
+
+	if not compact:
+		translator.body.extend(output)
+		raise docutils.nodes.SkipNode
+
+	translator.body.append('<div class="license-info license-info-compact">\n')
 	translator.body.extend(output)
+
+	# The "See more" link, with its index entry, comes from the node tree rather than the template.
+	for child in node.children:
+		if isinstance(child, nodes.flushright_text):
+			translator.body.append('<div class="see-more-wrapper">')
+			for grandchild in child.children:
+				grandchild.walkabout(translator)
+			translator.body.append("</div>\n")
+
+	translator.body.append("</div>\n")
 	raise docutils.nodes.SkipNode
 
 
@@ -122,3 +239,113 @@ def depart_license_info(translator: HTML5Translator, node: nodes.license_info) -
 	:param translator:
 	:param node:
 	"""
+
+
+def visit_license_info_latex(translator: LaTeXTranslator, node: nodes.license_info) -> None:
+	"""
+	Visit a :class:`~.license_info` node and generate LaTeX output.
+
+	The description and rules of each license are defined once, as a macro in the document's preamble,
+	and each :rst:dir:`license-info` directive for that license becomes a call to the macro.
+	The "See more information" link is emitted for every use, as it contains an index entry.
+
+	.. versionadded:: 0.7.0
+
+	:param translator:
+	:param node:
+	"""
+
+	macro_name = f"sphinxlicenseinfo@{node.license.spdx_id.lower()}"
+	children = list(node.children)
+
+	for split, child in enumerate(children):  # noqa: B007
+		if isinstance(child, nodes.flushright_text):
+			break
+	else:
+		split = len(children)
+
+	defined_macros = translator.__dict__.setdefault("_licenseinfo_macros", set())
+
+	if macro_name not in defined_macros:
+		start = len(translator.body)
+		for child in children[:split]:
+			child.walkabout(translator)
+
+		definition = ''.join(translator.body[start:]).strip('\n')
+		del translator.body[start:]
+
+		translator.elements["preamble"] += "\n".join([
+				'',
+				f"\\expandafter\\long\\expandafter\\def\\csname {macro_name}\\endcsname{{%",
+				definition,
+				'}',
+				])
+		defined_macros.add(macro_name)
+
+	translator.body.append(f"\n\\csname {macro_name}\\endcsname\n")
+
+	for child in children[split:]:
+		child.walkabout(translator)
+
+	translator.body.append('\n')
+	raise docutils.nodes.SkipNode
+
+
+def add_rules_legend(
+		app: Sphinx,
+		pagename: str,
+		templatename: str,
+		context: Dict[str, Any],
+		doctree: Optional[docutils.nodes.document],
+		) -> None:
+	"""
+	Append a legend describing each license rule used on the page to the page's body,
+	if :confval:`licenseinfo_compact` is enabled.
+
+	The rules in the compact :rst:dir:`license-info` output link to their entries in the legend.
+
+	.. versionadded:: 0.7.0
+
+	:param app: The Sphinx application.
+	:param pagename: The name of the page being rendered.
+	:param templatename: The name of the template used to render the page.
+	:param context: The context for the page's template.
+	:param doctree: The doctree for the page, if it was generated from a document.
+	"""
+
+	if not app.config.licenseinfo_compact or app.config.licenseinfo_lazy:
+		return
+
+	if doctree is None or "body" not in context:
+		return
+
+	findall = getattr(doctree, "findall", doctree.traverse)  # docutils < 0.18
+	rules: Dict[str, Dict[str, Rule]] = {category: {} for category in _rule_categories}
+
+	for node in findall(nodes.license_info):
+		for category in _rule_categories:
+			for rule in getattr(node.license, category):
+				rules[category].setdefault(rule.tag, rule)
+
+	if not any(rules.values()):
+		return
+
+	legend = ['<div class="license-rules-legend">', '<p class="rubric">License rules</p>']
+
+	for category, category_rules in rules.items():
+		if not category_rules:
+			continue
+
+		legend.append(f'<p class="label">{category.capitalize()}</p>')
+		legend.append(f'<dl class="license-{category}">')
+
+		for tag, rule in category_rules.items():
+			legend.append(
+					f'<dt id="licenseinfo-{category}-{html.escape(tag)}"><span class="license-sprite"></span>'
+					f"{html.escape(rule.label)}</dt><dd>{html.escape(rule.description)}</dd>"
+					)
+
+		legend.append("</dl>")
+
+	legend.append("</div>")
+	context["body"] += '\n'.join(legend)
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+#
+#  utils.py
+"""
+General utilities.
+
+.. versionadded:: 0.7.0
+"""
+#
+#  Copyright © 2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import functools
+import os
+import re
+import sys
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+# 3rd party
+from dist_meta.distributions import (
+		Distribution,
+		DistributionNotFoundError,
+		DistributionType,
+		iter_distributions
+		)
+from dist_meta.metadata_mapping import MetadataMapping
+from domdf_python_tools.compat import importlib_resources
+from domdf_python_tools.paths import PathPlus
+from domdf_python_tools.typing import PathLike
+from pychoosealicense import License, get_license
+
+# this package
+from sphinx_licenseinfo.cache import LicenseCache
+
+__all__ = [
+		"find_distribution",
+		"find_license_files",
+		"get_declared_license_files",
+		"get_distribution_index",
+		"get_license_id",
+		"get_site_packages",
+		"is_copyleft",
+		"iter_licenses",
+		"read_distribution_licenses",
+		]
+
+# Trove classifiers whose name differs from the title of the license on choosealicense.com.
+_classifier_ids = {
+		"Apache Software License": "Apache-2.0",
+		"Boost Software License 1.0 (BSL-1.0)": "BSL-1.0",
+		"CC0 1.0 Universal (CC0 1.0) Public Domain Dedication": "CC0-1.0",
+		"Eclipse Public License 1.0 (EPL-1.0)": "EPL-1.0",
+		"Eclipse Public License 2.0 (EPL-2.0)": "EPL-2.0",
+		"European Union Public Licence 1.1 (EUPL 1.1)": "EUPL-1.1",
+		"European Union Public Licence 1.2 (EUPL 1.2)": "EUPL-1.2",
+		"GNU Affero General Public License v3": "AGPL-3.0",
+		"GNU Affero General Public License v3 or later (AGPLv3+)": "AGPL-3.0",
+		"GNU Free Documentation License (FDL)": "GFDL-1.3",
+		"GNU General Public License v2 (GPLv2)": "GPL-2.0",
+		"GNU General Public License v2 or later (GPLv2+)": "GPL-2.0",
+		"GNU General Public License v3 (GPLv3)": "GPL-3.0",
+		"GNU General Public License v3 or later (GPLv3+)": "GPL-3.0",
+		"GNU Lesser General Public License v2 (LGPLv2)": "LGPL-2.1",
+		"GNU Lesser General Public License v2 or later (LGPLv2+)": "LGPL-2.1",
+		"GNU Lesser General Public License v3 (LGPLv3)": "LGPL-3.0",
+		"GNU Lesser General Public License v3 or later (LGPLv3+)": "LGPL-3.0",
+		"ISC License (ISCL)": "ISC",
+		"MIT No Attribution License (MIT-0)": "MIT-0",
+		"Mozilla Public License 2.0 (MPL 2.0)": "MPL-2.0",
+		"The Unlicense (Unlicense)": "Unlicense",
+		"Universal Permissive License (UPL)": "UPL-1.0",
+		"University of Illinois/NCSA Open Source License": "NCSA",
+		"zlib/libpng License": "Zlib",
+		}
+
+_expression_split_re = re.compile(r"\s+(?:OR|AND|WITH)\s+|[()]")
+_normalize_re = re.compile(r"[-_.]+")
+
+
+def _normalize(name: str) -> str:
+	# Normalize a distribution name per PEP 503
+	return _normalize_re.sub('-', name).lower()
+
+
+@functools.lru_cache(1)
+def iter_licenses() -> Tuple[License, ...]:
+	"""
+	Returns all licenses in the choosealicense.com catalogue, sorted by SPDX identifier.
+	"""
+
+	licenses = []
+
+	for license_file in importlib_resources.files("pychoosealicense._licenses").iterdir():
+		if license_file.name.endswith(".txt"):
+			licenses.append(get_license(license_file.name[:-4]))
+
+	return tuple(sorted(licenses, key=lambda lic: lic.spdx_id.lower()))
+
+
+@functools.lru_cache(1)
+def _get_titles() -> Dict[str, str]:
+	return {lic.title.lower(): lic.spdx_id for lic in iter_licenses()}
+
+
+def _lookup_license_id(name: str) -> Optional[str]:
+	name = name.strip()
+	if not name:
+		return None
+
+	name = _classifier_ids.get(name, name)
+
+	for suffix in ("-or-later", '+'):
+		if name.endswith(suffix):
+			name = name[:-len(suffix)]
+
+	try:
+		return get_license(name).spdx_id
+	except ValueError:
+		return _get_titles().get(name.lower())
+
+
+def get_license_id(distro: DistributionType) -> Optional[str]:
+	"""
+	Returns the SPDX identifier of the license of the given distribution,
+	or :py:obj:`None` if it cannot be determined.
+
+	The ``License-Expression`` metadata field is used if present,
+	followed by the ``License`` field and then the ``License ::`` trove classifiers.
+	Only licenses in the choosealicense.com catalogue are recognised.
+
+	:param distro:
+	"""
+
+	return _license_id_from_metadata(distro.get_metadata())
+
+
+def _license_id_from_metadata(metadata: MetadataMapping) -> Optional[str]:
+	candidates = []
+
+	if "License-Expression" in metadata:
+		# For compound expressions (e.g. ``Apache-2.0 OR BSD-2-Clause``) the first known license is used.
+		candidates.extend(_expression_split_re.split(metadata["License-Expression"]))
+
+	license_field = metadata.get("License", '').strip()
+	if license_field and '\n' not in license_field:
+		candidates.append(license_field)
+
+	for classifier in metadata.get_all("Classifier", default=[]):
+		if classifier.startswith("License :: "):
+			candidates.append(classifier.split(" :: ")[-1])
+
+	for candidate in candidates:
+		spdx_id = _lookup_license_id(candidate)
+		if spdx_id is not None:
+			return spdx_id
+
+	return None
+
+
+def is_copyleft(the_license: License) -> bool:
+	"""
+	Returns whether the license requires derivative works to be distributed under the same license.
+
+	:param the_license:
+	"""
+
+	return any(rule.tag.startswith("same-license") for rule in the_license.conditions)
+
+
+def get_declared_license_files(distro: DistributionType) -> List[str]:
+	"""
+	Returns the license files declared in the ``License-File`` fields of the distribution's metadata.
+
+	The filenames are relative to the ``.dist-info`` directory, and are in the order they were declared.
+	Files are looked for in the ``licenses`` subdirectory (per :pep:`639`),
+	and in the ``.dist-info`` directory itself (as written by older versions of setuptools).
+	Declared files which are missing from the distribution are ignored.
+
+	:param distro:
+	"""
+
+	license_files = []
+
+	for filename in distro.get_metadata().get_all("License-File", default=[]):
+		for candidate in (f"licenses/{filename}", filename):
+			if distro.has_file(candidate):
+				license_files.append(candidate)
+				break
+
+	return license_files
+
+
+def find_license_files(distro: Distribution) -> List[str]:
+	"""
+	Returns the sorted filenames of the files in the distribution's ``.dist-info`` directory
+	which look like license files.
+
+	This is used for distributions which do not declare their license files with ``License-File`` metadata.
+
+	:param distro:
+	"""
+
+	license_files = list(f.name for f in distro.path.glob("LICEN[CS]E*"))
+	licenses_dir = distro.path / "licenses"
+	if licenses_dir.is_dir():
+		license_files.extend(f"licenses/{f}" for f in os.listdir(licenses_dir))
+	return sorted(f for f in license_files if distro.path.joinpath(f).is_file())
+
+
+def _fingerprint_distribution(distro: Distribution) -> str:
+	# The size and modification time of each file in the .dist-info directory (including METADATA
+	# and any license files), so cached license texts are not reused after the files are changed.
+
+	entries = []
+
+	for dirpath, _, filenames in os.walk(distro.path):
+		for filename in filenames:
+			filepath = os.path.join(dirpath, filename)
+			try:
+				stat = os.stat(filepath)
+			except OSError:  # pragma: no cover
+				continue
+			entries.append(f"{os.path.relpath(filepath, distro.path)}:{stat.st_mtime_ns}:{stat.st_size}")
+
+	return '\n'.join(sorted(entries))
+
+
+def read_distribution_licenses(
+		distro: Distribution,
+		cache: Optional[LicenseCache] = None,
+		) -> Tuple[bool, List[Tuple[str, str]]]:
+	"""
+	Returns the filenames and content of the license files for the given distribution.
+
+	The files declared with ``License-File`` metadata are used if present,
+	otherwise files in the ``.dist-info`` directory named like ``LICENSE*`` are used.
+
+	:param distro:
+	:param cache: An optional cache to store the license files in.
+		Cached entries are invalidated when any file in the ``.dist-info`` directory changes.
+
+	:returns: Whether the files were declared in the metadata,
+		and a list of ``(filename, text)`` tuples.
+	"""
+
+	if cache is not None:
+		key = cache.make_key(
+				"py",
+				distro.name,
+				str(distro.version),
+				os.fspath(distro.path),
+				_fingerprint_distribution(distro),
+				)
+		cached = cache.get_json("license_text", key)
+		if cached is not None:
+			return cached["declared"], [tuple(entry) for entry in cached["licenses"]]  # type: ignore[misc]
+
+	license_files = get_declared_license_files(distro)
+	declared = bool(license_files)
+	if not declared:
+		license_files = find_license_files(distro)
+
+	licenses = [(filename, distro.read_file(filename)) for filename in license_files]
+
+	if cache is not None:
+		cache.set_json("license_text", key, {"declared": declared, "licenses": licenses})
+
+	return declared, licenses
+
+
+@functools.lru_cache(maxsize=32)
+def _index_distributions(path: str, mtime_ns: int) -> Mapping[str, Distribution]:
+	index: Dict[str, Distribution] = {}
+
+	for distro in iter_distributions([path]):
+		index.setdefault(_normalize(distro.name), distro)
+
+	return MappingProxyType(index)
+
+
+def get_distribution_index(path: PathLike) -> Mapping[str, Distribution]:
+	"""
+	Returns a mapping of normalised names to the distributions installed in the given directory.
+
+	The directory is only scanned once, and again if it is modified
+	(e.g. when a distribution is installed or removed).
+
+	:param path:
+	"""
+
+	path = os.path.abspath(path)
+
+	if not os.path.isdir(path):
+		return MappingProxyType({})
+
+	return _index_distributions(path, os.stat(path).st_mtime_ns)
+
+
+def find_distribution(name: str, path: Optional[Iterable[PathLike]] = None) -> Distribution:
+	"""
+	Returns the distribution with the given name.
+
+	This is equivalent to :func:`dist_meta.distributions.get_distribution`,
+	but uses :func:`~.get_distribution_index` so each directory on the path is only scanned once.
+
+	:param name:
+	:param path: The directories to search for distributions in. Defaults to :py:data:`sys.path`.
+
+	:raises dist_meta.distributions.DistributionNotFoundError: If the distribution cannot be found.
+	"""
+
+	if path is None:
+		path = sys.path
+
+	normalized_name = _normalize(name)
+
+	for directory in path:
+		distro = get_distribution_index(directory).get(normalized_name)
+		if distro is not None:
+			return distro
+
+	raise DistributionNotFoundError(name)
+
+
+def get_site_packages(venv: PathLike) -> List[PathPlus]:
+	"""
+	Returns the ``site-packages`` directories of the given virtual environment.
+
+	:param venv: The root directory of the virtual environment.
+
+	:raises FileNotFoundError: If the virtual environment has no ``site-packages`` directory.
+	"""
+
+	venv = PathPlus(venv)
+
+	candidates = [*sorted(venv.glob("lib/*/site-packages")), venv / "Lib" / "site-packages"]
+	site_packages = [directory for directory in candidates if directory.is_dir()]
+
+	if not site_packages:
+		raise FileNotFoundError(f"No 'site-packages' directory found in {os.fspath(venv)!r}")
+
+	return site_packages
+
+
+def _get_search_path(
+		srcdir: PathLike,
+		confdir: PathLike,
+		default: Union[str, List[str], None],
+		site_packages: Optional[str] = None,
+		venv: Optional[str] = None,
+		) -> Optional[List[str]]:
+	# Returns the directories to search for a distribution in, or None for sys.path.
+	# The options are relative to the source directory,
+	# and ``licenseinfo_site_packages`` (``default``) to the configuration directory.
+
+	if site_packages:
+		return [os.path.join(srcdir, site_packages)]
+
+	if venv:
+		return [os.fspath(directory) for directory in get_site_packages(os.path.join(srcdir, venv))]
+
+	if default:
+		if isinstance(default, str):
+			default = [default]
+		return [os.path.join(confdir, directory) for directory in default]
+
+	return None
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+#
+#  validate.py
+"""
+Check the licenses and distributions referred to in the documentation before it is read.
+
+.. versionadded:: 0.7.0
+"""
+#
+#  Copyright © 2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# 3rd party
+from dist_meta.distributions import DistributionNotFoundError
+from sphinx.application import Sphinx
+from sphinx.environment import BuildEnvironment
+from sphinx.errors import SphinxError
+from sphinx.util import logging
+
+# this package
+from sphinx_licenseinfo.cache import LicenseCache, get_cache, get_cached_license
+from sphinx_licenseinfo.utils import _get_search_path, find_distribution
+
+__all__ = [
+		"LicenseValidationError",
+		"Reference",
+		"iter_references",
+		"resolve_reference",
+		"validate_references",
+		]
+
+logger = logging.getLogger(__name__)
+
+_directive_re = re.compile(r"^(\s*)\.\.\s+([\w:-]+)::\s*(.*?)\s*$")
+_comment_re = re.compile(r"^(\s*)\.\.(?:\s+[^|\s][^:]*)?$")
+_option_re = re.compile(r"^\s+:([\w-]+):\s*(.*?)\s*$")
+_role_re = re.compile(r"(?<![\\`]):choosealicense:`(?:[^`<]*<([^`>]+)>|([^`]+))`")
+
+# Directives whose content is not parsed as reStructuredText.
+_literal_directives = {"code-block", "code", "sourcecode", "highlight", "literalinclude", "prompt", "raw"}
+
+
+class LicenseValidationError(SphinxError):
+	"""
+	Raised when :confval:`licenseinfo_validate` is ``'strict'`` and references to unknown licenses
+	or missing distributions are found.
+	"""
+
+	category = "License validation error"
+
+
+class Reference(NamedTuple):
+	"""
+	A reference to a license or distribution in a source file.
+	"""
+
+	#: The line number of the reference, starting from 1.
+	lineno: int
+
+	#: The type of reference: ``'license-info'``, ``'py'`` or ``'choosealicense'``.
+	kind: str
+
+	#: The SPDX identifier of the license, or the name of the distribution.
+	target: str
+
+	#: The :rst:dir:`license:site-packages` option given with :rst:dir:`license:py`.
+	site_packages: Optional[str] = None
+
+	#: The :rst:dir:`license:venv` option given with :rst:dir:`license:py`.
+	venv: Optional[str] = None
+
+
+def _license_reference(options: Dict[str, Tuple[int, str]]) -> Optional[Reference]:
+	# Returns the reference for the options of a license directive, if it has a :py: option.
+
+	if "py" not in options:
+		return None
+
+	lineno, target = options["py"]
+	site_packages = options["site-packages"][1] if "site-packages" in options else None
+	venv = options["venv"][1] if "venv" in options else None
+	return Reference(lineno, "py", target, site_packages, venv)
+
+
+def _indent(line: str) -> int:
+	return len(line) - len(line.lstrip())
+
+
+def iter_references(source: str) -> Iterator[Reference]:
+	"""
+	Returns an iterator over the :rst:dir:`license-info` directives, :rst:dir:`license:py` options
+	and :rst:role:`choosealicense` roles in the given reStructuredText source.
+
+	Literal blocks, code blocks and comments are skipped.
+
+	:param source:
+	"""
+
+	# Lines indented more than this are skipped, as they are part of a literal block or comment.
+	skip_indent: Optional[int] = None
+
+	# Lines indented more than this are the options of a license directive.
+	options_indent: Optional[int] = None
+	options: Dict[str, Tuple[int, str]] = {}
+
+	for lineno, line in enumerate(source.splitlines(), start=1):
+		if options_indent is not None:
+			option_match = _option_re.match(line)
+			if line.strip() and _indent(line) > options_indent and option_match:
+				if option_match.group(2):
+					options[option_match.group(1)] = (lineno, option_match.group(2))
+				continue
+
+			reference = _license_reference(options)
+			if reference is not None:
+				yield reference
+			options_indent = None
+
+		if not line.strip():
+			continue
+
+		indent = _indent(line)
+
+		if skip_indent is not None:
+			if indent > skip_indent:
+				continue
+			skip_indent = None
+
+		directive_match = _directive_re.match(line)
+		if directive_match:
+			name, argument = directive_match.group(2, 3)
+			if name == "license-info" and argument:
+				yield Reference(lineno, "license-info", argument)
+			elif name == "license":
+				options_indent = indent
+				options = {}
+			elif name in _literal_directives:
+				skip_indent = indent
+				continue
+		elif _comment_re.match(line):
+			skip_indent = indent
+			continue
+
+		for role_match in _role_re.finditer(line):
+			yield Reference(lineno, "choosealicense", (role_match.group(1) or role_match.group(2)).strip())
+
+		if line.rstrip().endswith("::") and not directive_match:
+			# The following indented block is a literal block.
+			skip_indent = indent
+
+	if options_indent is not None:
+		reference = _license_reference(options)
+		if reference is not None:
+			yield reference
+
+
+def resolve_reference(
+		kind: str,
+		target: str,
+		cache: Optional[LicenseCache] = None,
+		path: Optional[List[str]] = None,
+		) -> Optional[str]:
+	"""
+	Check that the given reference can be resolved.
+
+	:param kind: The type of reference: ``'license-info'``, ``'py'`` or ``'choosealicense'``.
+	:param target: The SPDX identifier of the license, or the name of the distribution.
+	:param cache: An optional cache for choosealicense.com licenses.
+	:param path: The directories to search for distributions in. Defaults to :py:data:`sys.path`.
+
+	:returns: A message describing the problem, or :py:obj:`None` if the reference is valid.
+	"""
+
+	if kind == "py":
+		try:
+			find_distribution(target, path)
+		except DistributionNotFoundError:
+			return f"Distribution {target!r} is not installed"
+	else:
+		try:
+			get_cached_license(target, cache)
+		except ValueError:
+			return f"Unknown license {target!r}"
+
+	return None
+
+
+def _find_problems(env: BuildEnvironment, docnames: Iterable[str]) -> List[Tuple[str, Reference, str]]:
+	references = []
+
+	for docname in sorted(docnames):
+		try:
+			with open(env.doc2path(docname), encoding=env.config.source_encoding) as fp:
+				source = fp.read()
+		except (OSError, UnicodeError):
+			# Sphinx reports these itself when it reads the document.
+			continue
+
+		references.extend((docname, reference) for reference in iter_references(source))
+
+	cache = get_cache(env.config)
+
+	def key(reference: Reference) -> Tuple[bool, str, str, str]:
+		if reference.kind == "py":
+			return True, reference.target, reference.site_packages or '', reference.venv or ''
+		return False, reference.target, '', ''
+
+	def resolve(target: Tuple[bool, str, str, str]) -> Optional[str]:
+		is_distribution, name, site_packages, venv = target
+
+		if not is_distribution:
+			return resolve_reference("license-info", name, cache)
+
+		try:
+			path = _get_search_path(
+					env.srcdir,
+					env.app.confdir,
+					env.config.licenseinfo_site_packages,
+					site_packages=site_packages,
+					venv=venv,
+					)
+		except FileNotFoundError as e:
+			return str(e)
+
+		return resolve_reference("py", name, path=path)
+
+	targets = sorted({key(reference) for _, reference in references})
+	with ThreadPoolExecutor() as executor:
+		results = dict(zip(targets, executor.map(resolve, targets)))
+
+	problems = []
+	for docname, reference in references:
+		message = results[key(reference)]
+		if message is not None:
+			problems.append((docname, reference, message))
+
+	return problems
+
+
+def validate_references(app: Sphinx, env: BuildEnvironment, docnames: List[str]) -> None:
+	"""
+	Check the licenses and distributions referred to in the documents which are about to be read.
+
+	This function is connected to the ``env-before-read-docs`` event,
+	and does nothing unless :confval:`licenseinfo_validate` is set.
+
+	:param app: The Sphinx application.
+	:param env: The Sphinx build environment.
+	:param docnames: The names of the documents which are about to be read.
+
+	:raises LicenseValidationError: If :confval:`licenseinfo_validate` is ``'strict'`` and a problem is found.
+	"""
+
+	if not app.config.licenseinfo_validate:
+		return
+
+	problems = _find_problems(env, docnames)
+
+	if app.config.licenseinfo_validate == "strict":
+		if problems:
+			raise LicenseValidationError('\n'.join(
+					f"{env.doc2path(docname)}:{reference.lineno}: {message}"
+					for docname, reference, message in problems
+					))
+	else:
+		for docname, reference, message in problems:
+			logger.warning(message, location=(docname, reference.lineno), type="licenseinfo", subtype="validate")
@@ -1,3 +1,11 @@
+# stdlib
+import shutil
+
+# 3rd party
+import handy_archives
+import pytest
+from domdf_python_tools.paths import PathPlus
+
 pytest_plugins = (
 		"pytest_regressions",
 		"coincidence",
@@ -10,3 +18,59 @@ def pytest_sessionfinish(session, exitstatus) -> None:  # noqa: MAN001
 	# 3rd party
 	from sphinx_toolbox.utils import GITHUB_COM
 	GITHUB_COM.session.close()
+
+
+def _make_doc_root(doc_root: PathPlus) -> None:
+	doc_root.maybe_make()
+	(doc_root / "conf.py").write_lines([
+			"extensions = ['sphinx_licenseinfo']",
+			"toml_spec_version = '0.5.0'",
+			])
+
+	shutil.copy2(PathPlus(__file__).parent / "index.rst", doc_root / "index.rst")
+
+	examples_dir = doc_root / "examples"
+	examples_dir.maybe_make()
+
+
+@pytest.fixture()
+def doc_root(tmp_pathplus: PathPlus) -> None:
+	_make_doc_root(tmp_pathplus.parent / "test-sphinx-licenseinfo")
+
+
+@pytest.fixture()
+def project_dir(tmp_pathplus: PathPlus) -> PathPlus:
+	# Like doc_root, but only used by a single test, so files written to it don't affect other tests.
+	project_dir = tmp_pathplus / "test-sphinx-licenseinfo"
+	_make_doc_root(project_dir)
+	return project_dir
+
+
+_original_wheel_directory = PathPlus(__file__).parent / "wheels"
+
+
+@pytest.fixture(scope="session")
+def wheel_directory() -> PathPlus:
+	return _original_wheel_directory
+
+
+@pytest.fixture()
+def fake_virtualenv(
+		wheel_directory: PathPlus,
+		tmp_pathplus: PathPlus,
+		monkeypatch,
+		) -> None:
+
+	site_packages = (tmp_pathplus / "python3.8" / "site-packages")
+
+	site_packages.mkdir(parents=True)
+
+	for filename in [
+			"Sphinx-3.5.4-py3-none-any.whl",
+			"packaging-21.0-py3-none-any.whl",
+			"CacheControl-0.12.6-py2.py3-none-any.whl",
+			]:
+
+		handy_archives.unpack_archive(str(wheel_directory / filename), site_packages)
+
+	monkeypatch.syspath_prepend(str(site_packages))
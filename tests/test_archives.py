@@ -0,0 +1,175 @@
+# stdlib
+import io
+import os
+import shutil
+import tarfile
+from typing import Callable
+
+# 3rd party
+import pytest
+from bs4 import BeautifulSoup
+from consolekit.terminal_colours import strip_ansi
+from domdf_python_tools.paths import PathPlus
+from sphinx.testing.path import path
+from sphinx.testing.util import SphinxTestApp
+
+# this package
+from sphinx_licenseinfo.archives import open_sdist, open_wheel, read_sdist_licenses, read_wheel_licenses
+
+wheels_dir = PathPlus(__file__).parent / "wheels"
+
+
+def make_sdist(filename: PathPlus, files: dict) -> None:
+	with tarfile.open(filename, "w:gz") as tf:
+		for name, content in files.items():
+			data = content.encode("UTF-8")
+			info = tarfile.TarInfo(f"demo-1.2.3/{name}")
+			info.size = len(data)
+			tf.addfile(info, io.BytesIO(data))
+
+
+def test_read_wheel_licenses():
+	licenses = read_wheel_licenses(wheels_dir / "Sphinx-3.5.4-py3-none-any.whl")
+	assert licenses.name == "Sphinx"
+	assert licenses.version == "3.5.4"
+	assert not licenses.declared
+	assert [filename for filename, _ in licenses.licenses] == ["LICENSE"]
+	assert licenses.licenses[0][1].startswith("License for Sphinx")
+
+	licenses = read_wheel_licenses(wheels_dir / "packaging-21.0-py3-none-any.whl")
+	assert licenses.declared
+	assert [filename for filename, _ in licenses.licenses] == ["LICENSE", "LICENSE.APACHE", "LICENSE.BSD"]
+
+	assert read_wheel_licenses(wheels_dir / "CacheControl-0.12.6-py2.py3-none-any.whl").licenses == []
+
+
+def test_read_sdist_licenses(tmp_pathplus: PathPlus):
+	make_sdist(
+			tmp_pathplus / "demo-1.2.3.tar.gz",
+			{
+					"PKG-INFO": "Metadata-Version: 2.2\nName: demo\nVersion: 1.2.3\nLicense-File: COPYING\n",
+					"COPYING": "The COPYING file",
+					"LICENSE": "The LICENSE file",
+					"src/demo/__init__.py": '',
+					},
+			)
+
+	licenses = read_sdist_licenses(tmp_pathplus / "demo-1.2.3.tar.gz")
+	assert licenses == ("demo", "1.2.3", True, [("COPYING", "The COPYING file")])
+
+	make_sdist(
+			tmp_pathplus / "demo-1.2.4.tar.gz",
+			{
+					"PKG-INFO": "Metadata-Version: 2.1\nName: demo\nVersion: 1.2.4\n",
+					"LICENSE.txt": "The LICENSE file",
+					"src/LICENSE": "Not the license file",
+					},
+			)
+
+	licenses = read_sdist_licenses(tmp_pathplus / "demo-1.2.4.tar.gz")
+	assert licenses == ("demo", "1.2.4", False, [("LICENSE.txt", "The LICENSE file")])
+
+
+def test_archive_cache(tmp_pathplus: PathPlus):
+	wheel = tmp_pathplus / "Sphinx-3.5.4-py3-none-any.whl"
+	shutil.copy2(wheels_dir / wheel.name, wheel)
+	assert open_wheel(wheel) is open_wheel(wheel)
+
+	sdist = tmp_pathplus / "demo-1.2.3.tar.gz"
+	pkg_info = "Metadata-Version: 2.1\nName: demo\nVersion: 1.2.3\n"
+	make_sdist(sdist, {"PKG-INFO": pkg_info, "LICENSE": "Old"})
+	first = open_sdist(sdist)
+	assert open_sdist(sdist) is first
+
+	# Reopened when the file changes
+	make_sdist(sdist, {"PKG-INFO": pkg_info, "LICENSE": "New license"})
+	PathPlus(sdist).touch()
+	assert open_sdist(sdist) is not first
+	assert open_sdist(sdist).read_text("LICENSE") == "New license"
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="Requires /proc")
+def test_archives_closed(tmp_pathplus: PathPlus):
+	wheel = tmp_pathplus / "Sphinx-3.5.4-py3-none-any.whl"
+	shutil.copy2(wheels_dir / wheel.name, wheel)
+	sdist = tmp_pathplus / "demo-1.2.3.tar.gz"
+	make_sdist(sdist, {"PKG-INFO": "Metadata-Version: 2.1\nName: demo\nVersion: 1.2.3\n", "COPYING": "Copying"})
+
+	open_files = len(os.listdir("/proc/self/fd"))
+
+	assert read_wheel_licenses(wheel).licenses[0][0] == "LICENSE"
+	assert open_sdist(sdist).read_text("COPYING") == "Copying"
+
+	# The cached archives only hold their index, not open file handles.
+	assert len(os.listdir("/proc/self/fd")) == open_files
+
+
+def test_archive_directive(project_dir: PathPlus, make_app: Callable[..., SphinxTestApp]):
+	wheelhouse = project_dir / "wheelhouse"
+	wheelhouse.maybe_make()
+	shutil.copy2(wheels_dir / "Sphinx-3.5.4-py3-none-any.whl", wheelhouse)
+	make_sdist(
+			wheelhouse / "demo-1.2.3.tar.gz",
+			{"PKG-INFO": "Metadata-Version: 2.1\nName: demo\nVersion: 1.2.3\n", "LICENSE": "The demo license"},
+			)
+
+	(project_dir / "archives.rst").write_lines([
+			":orphan:",
+			'',
+			"Archives",
+			"========",
+			'',
+			".. license::",
+			"\t:wheel: wheelhouse/Sphinx-3.5.4-py3-none-any.whl",
+			'',
+			".. license::",
+			"\t:sdist: wheelhouse/demo-1.2.3.tar.gz",
+			])
+
+	app = make_app("html", srcdir=path(project_dir))
+	app.build()
+
+	assert "archives.rst" not in strip_ansi(app._warning.getvalue())  # type: ignore[attr-defined]
+
+	page = BeautifulSoup((PathPlus(app.outdir) / "archives.html").read_text(), "html5lib")
+	code_blocks = page.select("div.body pre")
+	assert len(code_blocks) == 2
+	assert code_blocks[0].text.startswith("License for Sphinx")
+	assert code_blocks[1].text.strip() == "The demo license"
+
+
+def test_archive_directive_errors(project_dir: PathPlus, make_app: Callable[..., SphinxTestApp]):
+	wheelhouse = project_dir / "wheelhouse"
+	wheelhouse.maybe_make()
+	(wheelhouse / "corrupt-1.0-py3-none-any.whl").write_text("Not a wheel")
+	(wheelhouse / "corrupt-1.0.tar.gz").write_text("Not an sdist")
+	make_sdist(wheelhouse / "no-pkg-info-1.0.tar.gz", {"LICENSE": "The demo license"})
+
+	(project_dir / "archives.rst").write_lines([
+			":orphan:",
+			'',
+			"Archives",
+			"========",
+			'',
+			".. license::",
+			"\t:wheel: wheelhouse/missing-1.0-py3-none-any.whl",
+			'',
+			".. license::",
+			"\t:wheel: wheelhouse/corrupt-1.0-py3-none-any.whl",
+			'',
+			".. license::",
+			"\t:sdist: wheelhouse/corrupt-1.0.tar.gz",
+			'',
+			".. license::",
+			"\t:sdist: wheelhouse/no-pkg-info-1.0.tar.gz",
+			])
+
+	app = make_app("html", srcdir=path(project_dir))
+	app.build()
+
+	warnings = strip_ansi(app._warning.getvalue())  # type: ignore[attr-defined]
+	assert "archives.rst:6: WARNING: [Errno 2] No such file or directory" in warnings
+	assert "archives.rst:9: WARNING: Unable to read 'corrupt-1.0-py3-none-any.whl'" in warnings
+	assert "archives.rst:12: WARNING: Unable to read 'corrupt-1.0.tar.gz'" in warnings
+	assert "archives.rst:15: WARNING: 'PKG-INFO' not found" in warnings
+	assert (PathPlus(app.outdir) / "archives.html").is_file()
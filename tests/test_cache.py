@@ -0,0 +1,182 @@
+# stdlib
+import os
+import shutil
+import time
+from typing import Callable
+
+# 3rd party
+import handy_archives
+import pychoosealicense
+import pytest
+from bs4 import BeautifulSoup
+from domdf_python_tools.paths import PathPlus
+from sphinx.testing.path import path
+from sphinx.testing.util import SphinxTestApp
+
+# this package
+from sphinx_licenseinfo import translators
+from sphinx_licenseinfo.cache import LicenseCache, get_cached_license
+from sphinx_licenseinfo.utils import find_distribution, read_distribution_licenses
+
+
+def test_cache_roundtrip(tmp_pathplus: PathPlus):
+	cache = LicenseCache(tmp_pathplus / "cache")
+	key = cache.make_key("html", "MIT")
+
+	assert cache.get("html", key) is None
+	cache.set("html", key, "<div>MIT</div>")
+	assert cache.get("html", key) == "<div>MIT</div>"
+
+	# Different namespaces and parts don't collide
+	assert cache.get("license_text", key) is None
+	assert cache.make_key("html", "MIT") != cache.make_key("html", "Apache-2.0")
+
+	# No temporary files or lock files left behind
+	assert not [f for f in (tmp_pathplus / "cache").rglob(".*") if f.is_file()]
+
+
+def test_cache_eviction(tmp_pathplus: PathPlus):
+	cache = LicenseCache(tmp_pathplus / "cache", max_size=350)
+
+	keys = [cache.make_key(str(i)) for i in range(3)]
+	for idx, key in enumerate(keys):
+		cache.set("text", key, str(idx) * 100)
+		os.utime(cache._entry("text", key), (time.time() - 100 + idx, time.time() - 100 + idx))
+
+	# Reading the oldest entry marks it as recently used
+	assert cache.get("text", keys[0]) == '0' * 100
+
+	cache.set("text", cache.make_key("new"), 'n' * 100)
+
+	assert cache.size() <= 350
+	assert cache.get("text", keys[0]) is not None
+	assert cache.get("text", keys[1]) is None
+
+
+def test_cache_size(tmp_pathplus: PathPlus):
+	cache = LicenseCache(tmp_pathplus / "cache")
+	key = cache.make_key("text")
+
+	cache.set("text", key, 'x' * 100)
+	assert cache._size == cache.size() == 100
+
+	# Sizes are counted in bytes, not characters.
+	cache.set("text", cache.make_key("other"), "©" * 50)
+	assert cache._size == cache.size() == 200
+
+	# Overwriting an entry replaces its size rather than adding to it.
+	for _ in range(5):
+		cache.set("text", key, 'y' * 100)
+	assert cache._size == cache.size() == 200
+
+
+def test_cache_dir_relative_to_confdir(
+		project_dir: PathPlus,
+		make_app: Callable[..., SphinxTestApp],
+		monkeypatch,
+		):
+	monkeypatch.delenv("SPHINX_LICENSEINFO_CACHE_DIR", raising=False)
+	monkeypatch.chdir(project_dir.parent)
+	(project_dir / "index.rst").write_lines(["Title", "=====", '', ".. license-info:: MIT"])
+
+	app = make_app("html", srcdir=path(project_dir), confoverrides={"licenseinfo_cache_dir": ".licenseinfo"})
+	assert app.config.licenseinfo_cache_dir == os.path.join(project_dir, ".licenseinfo")
+	app.build()
+
+	assert (project_dir / ".licenseinfo" / "choosealicense").is_dir()
+	assert not (project_dir.parent / ".licenseinfo").exists()
+
+
+def test_cached_license(tmp_pathplus: PathPlus):
+	cache = LicenseCache(tmp_pathplus / "cache")
+
+	first = get_cached_license("MIT", cache)
+	second = get_cached_license("mit", cache)
+	assert first == second
+	assert second.permissions[0].tag == "commercial-use"
+
+	with pytest.raises(ValueError, match="Unknown license identifier 'not-a-license'"):
+		get_cached_license("not-a-license", cache)
+
+
+def test_cached_distribution_licenses(tmp_pathplus: PathPlus, wheel_directory: PathPlus):
+	site_packages = tmp_pathplus / "site-packages"
+	handy_archives.unpack_archive(str(wheel_directory / "Sphinx-3.5.4-py3-none-any.whl"), site_packages)
+	cache = LicenseCache(tmp_pathplus / "cache")
+
+	distro = find_distribution("sphinx", [site_packages])
+	assert read_distribution_licenses(distro, cache)[1][0][1].startswith("License for Sphinx")
+
+	# The cached text is not used once the license file changes, e.g. in an editable install.
+	(PathPlus(distro.path) / "LICENSE").write_text("An edited license")
+	distro = find_distribution("sphinx", [site_packages])
+	assert read_distribution_licenses(distro, cache) == (False, [("LICENSE", "An edited license")])
+
+
+@pytest.mark.usefixtures("fake_virtualenv")
+def test_shared_cache_build(
+		project_dir: PathPlus,
+		tmp_pathplus: PathPlus,
+		make_app: Callable[..., SphinxTestApp],
+		):
+	cache_dir = tmp_pathplus / "shared-cache"
+	shutil.copy2(PathPlus(__file__).parent / "examples" / "mit.rst", project_dir / "examples" / "mit.rst")
+
+	app = make_app("html", srcdir=path(project_dir), confoverrides={"licenseinfo_cache_dir": str(cache_dir)})
+	app.build()
+	output_file = PathPlus(app.outdir) / "examples" / "mit.html"
+	uncached = BeautifulSoup(output_file.read_text(), "html5lib").find("div", class_="license-info")
+
+	assert (cache_dir / "html").is_dir()
+	assert (cache_dir / "choosealicense").is_dir()
+	assert (cache_dir / "license_text").is_dir()
+
+	app.build(force_all=True)
+	cached = BeautifulSoup(output_file.read_text(), "html5lib").find("div", class_="license-info")
+
+	assert str(cached) == str(uncached)
+
+
+def test_fragment_cache(project_dir: PathPlus, make_app: Callable[..., SphinxTestApp], monkeypatch):
+	(project_dir / "fragments.rst").write_lines([
+			":orphan:",
+			'',
+			"Fragments",
+			"=========",
+			'',
+			".. license-info:: MIT",
+			])
+
+	app = make_app("html", srcdir=path(project_dir))
+	app.build()
+
+	fragment_cache = LicenseCache(PathPlus(app.doctreedir) / "licenseinfo")
+	template_hash, _ = translators._get_license_template()
+	key = fragment_cache.make_key("license_info", "MIT", pychoosealicense.__version__, template_hash)
+	assert '<div class="license-info">' in fragment_cache.get("html", key)
+
+	def render(*args):
+		raise AssertionError("The license should not be rendered again.")
+
+	monkeypatch.setattr(translators, "_render_license_info", render)
+
+	# Other HTML builders sharing the doctree directory reuse the rendered fragment.
+	for buildername in ("dirhtml", "singlehtml", "epub"):
+		other_app = make_app(buildername, srcdir=path(project_dir))
+		assert PathPlus(other_app.doctreedir) == PathPlus(app.doctreedir)
+		other_app.build(force_all=True)
+
+	assert '<div class="license-info">' in (PathPlus(other_app.outdir) / "fragments.xhtml").read_text()
+
+	monkeypatch.undo()
+
+	# A new template invalidates the cached fragment
+	(project_dir / "license_info.t.html").write_text('<p class="custom">{{ license.title }}</p>\n')
+	app = make_app("html", srcdir=path(project_dir), confoverrides={"licenseinfo_template": "license_info.t.html"})
+	app.build(force_all=True)
+
+	assert '<p class="custom">MIT License</p>' in (PathPlus(app.outdir) / "fragments.html").read_text()
+
+	template_hash, _ = translators._get_license_template(project_dir / "license_info.t.html")
+	key = fragment_cache.make_key("license_info", "MIT", pychoosealicense.__version__, template_hash)
+	assert fragment_cache.get("html", key) == '<p class="custom">MIT License</p>'
@@ -0,0 +1,64 @@
+# stdlib
+from typing import Callable
+
+# 3rd party
+from bs4 import BeautifulSoup
+from domdf_python_tools.paths import PathPlus
+from sphinx.testing.path import path
+from sphinx.testing.util import SphinxTestApp
+
+# this package
+from sphinx_licenseinfo.utils import iter_licenses
+
+
+def _build_catalogue(srcdir: PathPlus, make_app: Callable[..., SphinxTestApp], *conf_lines: str) -> PathPlus:
+	srcdir.maybe_make(parents=True)
+	(srcdir / "conf.py").write_lines(["extensions = ['sphinx_licenseinfo']", *conf_lines])
+
+	content = ["Licenses", "========"]
+	for the_license in iter_licenses():
+		content.extend(['', f".. license-info:: {the_license.spdx_id}"])
+	(srcdir / "index.rst").write_lines(content)
+
+	app = make_app("html", srcdir=path(srcdir))
+	app.build()
+
+	return PathPlus(app.outdir) / "index.html"
+
+
+def test_compact_size(tmp_pathplus: PathPlus, make_app: Callable[..., SphinxTestApp]):
+	default_page = _build_catalogue(tmp_pathplus / "default", make_app)
+	compact_page = _build_catalogue(tmp_pathplus / "compact", make_app, "licenseinfo_compact = True")
+
+	default_size = len(default_page.read_bytes())
+	compact_size = len(compact_page.read_bytes())
+	assert compact_size < default_size * 0.6, f"Default: {default_size} bytes, compact: {compact_size} bytes"
+
+
+def test_compact_output(tmp_pathplus: PathPlus, make_app: Callable[..., SphinxTestApp]):
+	page = BeautifulSoup(
+			_build_catalogue(tmp_pathplus / "compact", make_app, "licenseinfo_compact = True").read_text(),
+			"html5lib",
+			)
+
+	blocks = page.select("div.license-info-compact")
+	assert len(blocks) == len(iter_licenses())
+
+	# Rule descriptions are only given in the legend
+	assert not page.select(".license-rules li[title]")
+
+	legends = page.select("div.license-rules-legend")
+	assert len(legends) == 1
+	legend_ids = {dt["id"] for dt in legends[0].find_all("dt")}
+	assert "licenseinfo-permissions-patent-use" in legend_ids
+	assert "licenseinfo-limitations-patent-use" in legend_ids
+
+	for block in blocks:
+		for link in block.select(".license-rules a"):
+			assert link["href"][1:] in legend_ids
+
+		# The "See more" link comes from the node tree, once per block, with its index entry target.
+		see_more = block.select("div.see-more-wrapper a.choosealicense")
+		assert len(see_more) == 1
+		assert see_more[0]["href"].startswith("https://choosealicense.com/licenses/")
+		assert block.select("div.see-more-wrapper span[id^=index-]")
@@ -0,0 +1,108 @@
+# stdlib
+import time
+from typing import Callable, Dict
+
+# 3rd party
+import handy_archives
+import pytest
+from bs4 import BeautifulSoup
+from coincidence.params import param
+from domdf_python_tools.paths import PathPlus
+from sphinx.testing.path import path
+from sphinx.testing.util import SphinxTestApp
+
+# this package
+from sphinx_licenseinfo.identify import get_fingerprint_index, identify_license
+from sphinx_licenseinfo.utils import iter_licenses
+
+tests_dir = PathPlus(__file__).parent
+
+
+def _get_test_texts() -> Dict[str, str]:
+	texts = {"GIMP_COPYING": (tests_dir / "GIMP_COPYING").read_text()}
+
+	for wheel, filenames in [
+			("Sphinx-3.5.4-py3-none-any.whl", ["Sphinx-3.5.4.dist-info/LICENSE"]),
+			(
+					"packaging-21.0-py3-none-any.whl",
+					["packaging-21.0.dist-info/LICENSE.APACHE", "packaging-21.0.dist-info/LICENSE.BSD"],
+					),
+			]:
+		with handy_archives.ZipFile(tests_dir / "wheels" / wheel) as zf:
+			for filename in filenames:
+				texts[filename] = zf.read_text(filename)
+
+	return texts
+
+
+@pytest.mark.parametrize(
+		"filename, expected",
+		[
+				param("GIMP_COPYING", "GPL-3.0", id="GIMP_COPYING"),
+				param("packaging-21.0.dist-info/LICENSE.APACHE", "Apache-2.0", id="packaging-apache"),
+				param("packaging-21.0.dist-info/LICENSE.BSD", "BSD-2-Clause", id="packaging-bsd"),
+				],
+		)
+def test_identify_license(filename: str, expected: str):
+	the_license = identify_license(_get_test_texts()[filename])
+	assert the_license is not None
+	assert the_license.spdx_id == expected
+
+
+def test_identify_catalogue():
+	for the_license in iter_licenses():
+		identified = identify_license(the_license.content)
+		assert identified is not None
+		assert identified.spdx_id == the_license.spdx_id
+
+
+def test_identify_unknown():
+	assert identify_license("This software may only be used on Tuesdays.") is None
+	assert identify_license('') is None
+
+	# Contains the licenses of several bundled libraries, so no single license is a close enough match.
+	assert identify_license(_get_test_texts()["Sphinx-3.5.4.dist-info/LICENSE"]) is None
+
+
+def test_identify_benchmark():
+	get_fingerprint_index()  # Built once per process
+
+	texts = [*_get_test_texts().values(), *(lic.content for lic in iter_licenses())]
+	texts = texts * (300 // len(texts) + 1)
+
+	start = time.perf_counter()
+	for text in texts:
+		identify_license(text)
+	per_text = (time.perf_counter() - start) / len(texts)
+
+	assert per_text < 0.02, f"Classified {len(texts)} license texts in {per_text * 1000:.2f}ms each"
+
+
+def test_identify_directive(project_dir: PathPlus, make_app: Callable[..., SphinxTestApp]):
+	(project_dir / "GIMP_COPYING").write_text((tests_dir / "GIMP_COPYING").read_text())
+	(project_dir / "UNKNOWN_LICENSE").write_text("This software may only be used on Tuesdays.")
+	(project_dir / "identify.rst").write_lines([
+			":orphan:",
+			'',
+			"Identify",
+			"========",
+			'',
+			".. license::",
+			"\t:file: GIMP_COPYING",
+			"\t:identify:",
+			'',
+			".. license::",
+			"\t:file: UNKNOWN_LICENSE",
+			"\t:identify:",
+			])
+
+	app = make_app("html", srcdir=path(project_dir))
+	app.build()
+
+	page = BeautifulSoup((PathPlus(app.outdir) / "identify.html").read_text(), "html5lib")
+	license_info = page.find_all("div", class_="license-info")
+	assert len(license_info) == 1
+	assert license_info[0].find("a", class_="see-more")["href"] == "https://choosealicense.com/licenses/gpl-3.0/"
+
+	capout = app._warning.getvalue()  # type: ignore[attr-defined]
+	assert "identify.rst:10: WARNING: Unable to identify the license from its text." in capout
@@ -0,0 +1,129 @@
+# stdlib
+from typing import Callable
+
+# 3rd party
+import pytest
+from bs4 import BeautifulSoup
+from domdf_python_tools.paths import PathPlus
+from sphinx.testing.path import path
+from sphinx.testing.util import SphinxTestApp
+
+# this package
+from sphinx_licenseinfo.license_index import get_license_index
+
+
+@pytest.mark.usefixtures("fake_virtualenv")
+def test_index_pages(project_dir: PathPlus, make_app: Callable[..., SphinxTestApp]):
+	srcdir = project_dir
+
+	index_test_dir = srcdir / "index_test"
+	index_test_dir.maybe_make()
+	(index_test_dir / "hatch.rst").write_lines([
+			":orphan:",
+			'',
+			"Hatch",
+			"=====",
+			'',
+			".. license::",
+			"\t:py: hatch",
+			])
+	(index_test_dir / "docs.rst").write_lines([
+			":orphan:",
+			'',
+			"Docs",
+			"====",
+			'',
+			".. license::",
+			"\t:py: hatch",
+			])
+	(index_test_dir / "gimp.rst").write_lines([
+			":orphan:",
+			'',
+			"GIMP",
+			"====",
+			'',
+			".. license::",
+			"\t:file: COPYING",
+			])
+	(srcdir / "COPYING").write_text("Not a Python distribution")
+
+	app = make_app("html", srcdir=path(srcdir), confoverrides={"licenseinfo_index_pages": True})
+	outdir = PathPlus(app.outdir)
+	app.build()
+
+	index = get_license_index(app.env)
+	assert index["MIT"]["hatch"] == {"index_test/docs", "index_test/hatch"}
+	assert "COPYING" not in str(index)
+
+	index_page = BeautifulSoup((outdir / "license-index" / "index.html").read_text(), "html5lib")
+	link = index_page.find("a", string="MIT License")
+	assert link is not None
+	assert link["href"] == "mit.html"
+
+	mit_page = BeautifulSoup((outdir / "license-index" / "mit.html").read_text(), "html5lib")
+	hrefs = [a["href"] for a in mit_page.select("div.body li a")]
+	assert "../index_test/docs.html" in hrefs
+	assert "../index_test/hatch.html" in hrefs
+
+	copyleft_page = BeautifulSoup((outdir / "license-index" / "copyleft.html").read_text(), "html5lib")
+	assert "MIT License" not in [h2.text for h2 in copyleft_page.find_all("h2")]
+
+	# The page body starts with its heading, with no stray text before it.
+	for page in (index_page, mit_page, copyleft_page):
+		body = page.select_one("div.body")
+		assert not ''.join(body.find_all(string=True, recursive=False)).strip()
+		assert body.find(True).name == "h1"
+
+	# Only pages whose content changes are regenerated.
+	mtimes = {f.name: f.stat().st_mtime_ns for f in (outdir / "license-index").iterdir()}
+
+	(index_test_dir / "docs.rst").write_lines([
+			":orphan:",
+			'',
+			"Docs",
+			"====",
+			'',
+			".. license::",
+			"\t:py: packaging",
+			])
+	app.build()
+
+	index = get_license_index(app.env)
+	assert index["MIT"]["hatch"] == {"index_test/hatch"}
+	assert index["Apache-2.0"]["packaging"] == {"index_test/docs"}
+
+	new_mtimes = {f.name: f.stat().st_mtime_ns for f in (outdir / "license-index").iterdir()}
+	assert new_mtimes["mit.html"] != mtimes["mit.html"]
+	assert new_mtimes["index.html"] != mtimes["index.html"]
+	assert new_mtimes["copyleft.html"] == mtimes["copyleft.html"]
+	assert "apache-2.0.html" in new_mtimes
+
+	# All pages are regenerated when the theme changes.
+	app = make_app(
+			"html",
+			srcdir=path(srcdir),
+			confoverrides={"licenseinfo_index_pages": True, "html_theme": "classic"},
+			)
+	app.build()
+
+	for page in ("index.html", "license-index/index.html", "license-index/copyleft.html"):
+		assert "_static/classic.css" in (outdir / page).read_text()
+
+
+@pytest.mark.usefixtures("fake_virtualenv")
+def test_index_pages_disabled(project_dir: PathPlus, make_app: Callable[..., SphinxTestApp]):
+	(project_dir / "index_test").maybe_make()
+	(project_dir / "index_test" / "hatch.rst").write_lines([
+			":orphan:",
+			'',
+			"Hatch",
+			"=====",
+			'',
+			".. license::",
+			"\t:py: hatch",
+			])
+
+	app = make_app("html", srcdir=path(project_dir))
+	app.build()
+
+	assert not (PathPlus(app.outdir) / "license-index").exists()
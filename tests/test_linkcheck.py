@@ -0,0 +1,83 @@
+# stdlib
+import http.server
+import json
+import threading
+from typing import Callable, Iterator, List
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+from sphinx.testing.path import path
+from sphinx.testing.util import SphinxTestApp
+
+
+class RecordingProxyHandler(http.server.BaseHTTPRequestHandler):
+	requests: List[str] = []
+
+	def _record(self) -> None:
+		self.requests.append(self.path)
+		self.send_error(502)
+
+	do_CONNECT = do_GET = do_HEAD = _record
+
+	def log_message(self, *args) -> None:
+		pass
+
+
+@pytest.fixture()
+def proxy_server(monkeypatch) -> Iterator[List[str]]:
+	RecordingProxyHandler.requests = []
+	server = http.server.ThreadingHTTPServer(("localhost", 0), RecordingProxyHandler)
+	thread = threading.Thread(target=server.serve_forever, daemon=True)
+	thread.start()
+
+	proxy = f"http://localhost:{server.server_address[1]}"
+	for variable in ("http_proxy", "https_proxy", "HTTP_PROXY", "HTTPS_PROXY"):
+		monkeypatch.setenv(variable, proxy)
+	for variable in ("no_proxy", "NO_PROXY"):
+		monkeypatch.delenv(variable, raising=False)
+
+	try:
+		yield RecordingProxyHandler.requests
+	finally:
+		server.shutdown()
+		server.server_close()
+
+
+def test_linkcheck_offline(tmp_pathplus: PathPlus, make_app: Callable[..., SphinxTestApp], proxy_server: List[str]):
+	srcdir = tmp_pathplus / "linkcheck"
+	srcdir.maybe_make()
+	(srcdir / "conf.py").write_lines([
+			"extensions = ['sphinx_licenseinfo']",
+			"linkcheck_timeout = 5",
+			"linkcheck_workers = 1",
+			])
+	(srcdir / "index.rst").write_lines([
+			"Links",
+			"=====",
+			'',
+			".. license-info:: Apache-2.0",
+			'',
+			"The :choosealicense:`MIT` license,",
+			"and `a missing license <http://choosealicense.com/licenses/mti/>`_.",
+			])
+
+	app = make_app("linkcheck", srcdir=path(srcdir))
+	app.build()
+
+	# The stand-in server only sees the link which is not in the catalogue (with HEAD, then GET).
+	# The other links would be tunnelled through it with CONNECT requests to "choosealicense.com:443".
+	assert proxy_server
+	assert set(proxy_server) == {"http://choosealicense.com/licenses/mti/"}
+
+	results = {}
+	for line in (PathPlus(app.outdir) / "output.json").read_lines():
+		if line:
+			result = json.loads(line)
+			results[result["uri"]] = result["status"]
+
+	assert results == {
+			"https://choosealicense.com/licenses/apache-2.0/": "ignored",
+			"https://choosealicense.com/licenses/mit/": "ignored",
+			"http://choosealicense.com/licenses/mti/": "broken",
+			}
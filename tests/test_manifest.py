@@ -0,0 +1,121 @@
+# stdlib
+import json
+import shutil
+from typing import Callable
+
+# 3rd party
+import pytest
+from bs4 import BeautifulSoup
+from domdf_python_tools.paths import PathPlus
+from sphinx.testing.path import path
+from sphinx.testing.util import SphinxTestApp
+
+wheels_dir = PathPlus(__file__).parent / "wheels"
+
+
+def _make_project(srcdir: PathPlus, *conf_lines: str) -> None:
+	srcdir.maybe_make(parents=True)
+	(srcdir / "conf.py").write_lines(["extensions = ['sphinx_licenseinfo']", *conf_lines])
+	(srcdir / "wheelhouse").maybe_make()
+	shutil.copy2(wheels_dir / "Sphinx-3.5.4-py3-none-any.whl", srcdir / "wheelhouse")
+
+	(srcdir / "index.rst").write_lines([
+			"Index",
+			"=====",
+			'',
+			".. toctree::",
+			'',
+			"\tapi/packaging",
+			'',
+			".. license-info:: MIT",
+			'',
+			".. license::",
+			"\t:wheel: wheelhouse/Sphinx-3.5.4-py3-none-any.whl",
+			])
+	(srcdir / "api").maybe_make()
+	(srcdir / "api" / "packaging.rst").write_lines([
+			"Packaging",
+			"=========",
+			'',
+			".. license::",
+			"\t:py: packaging",
+			"\t:all:",
+			'',
+			".. license-info:: MIT",
+			'',
+			".. license-info:: Apache-2.0",
+			])
+
+
+@pytest.mark.usefixtures("fake_virtualenv")
+def test_manifest(tmp_pathplus: PathPlus, make_app: Callable[..., SphinxTestApp]):
+	srcdir = tmp_pathplus / "manifest"
+	_make_project(srcdir, "licenseinfo_manifest = True")
+
+	app = make_app("html", srcdir=path(srcdir))
+	app.build()
+
+	manifest = json.loads((PathPlus(app.outdir) / "licenses.json").read_text())
+
+	assert sorted(manifest["licenses"]) == ["Apache-2.0", "MIT"]
+	mit = manifest["licenses"]["MIT"]
+	assert mit["title"] == "MIT License"
+	assert mit["url"] == "https://choosealicense.com/licenses/mit/"
+	assert [rule["tag"] for rule in mit["conditions"]] == ["include-copyright"]
+	assert len(mit["sha256"]) == 64
+	assert mit["documents"] == [
+			{"docname": "api/packaging", "uri": "api/packaging.html"},
+			{"docname": "index", "uri": "index.html"},
+			]
+
+	assert sorted(manifest["distributions"]) == ["Sphinx==3.5.4", "packaging==21.0"]
+	packaging = manifest["distributions"]["packaging==21.0"]
+	assert packaging["license"] == "Apache-2.0"
+	assert sorted(packaging["license_files"]) == ["LICENSE", "LICENSE.APACHE", "LICENSE.BSD"]
+	assert packaging["documents"] == [{"docname": "api/packaging", "uri": "api/packaging.html"}]
+	# Sphinx only declares "BSD", which is ambiguous.
+	assert manifest["distributions"]["Sphinx==3.5.4"]["license"] is None
+
+	# Documents which no longer show a license are removed from the manifest.
+	(srcdir / "api" / "packaging.rst").write_lines(["Packaging", "========="])
+	app.build()
+
+	manifest = json.loads((PathPlus(app.outdir) / "licenses.json").read_text())
+	assert list(manifest["licenses"]) == ["MIT"]
+	assert manifest["licenses"]["MIT"]["documents"] == [{"docname": "index", "uri": "index.html"}]
+	assert list(manifest["distributions"]) == ["Sphinx==3.5.4"]
+
+
+@pytest.mark.usefixtures("fake_virtualenv")
+def test_manifest_lazy(tmp_pathplus: PathPlus, make_app: Callable[..., SphinxTestApp]):
+	srcdir = tmp_pathplus / "lazy"
+	_make_project(srcdir, "licenseinfo_lazy = True")
+
+	app = make_app("html", srcdir=path(srcdir))
+	app.build()
+
+	outdir = PathPlus(app.outdir)
+	assert (outdir / "_static" / "js" / "license_info.js").is_file()
+	assert "Apache-2.0" in json.loads((outdir / "licenses.json").read_text())["licenses"]
+
+	page = BeautifulSoup((outdir / "api" / "packaging.html").read_text(), "html5lib")
+	assert page.find("script", src="../_static/js/license_info.js") is not None
+	assert page.find("table", class_="license-rules") is None
+
+	placeholders = page.select("div.license-info-lazy")
+	assert [placeholder["data-license"] for placeholder in placeholders] == ["MIT", "Apache-2.0"]
+	assert placeholders[0]["data-manifest"] == "../licenses.json"
+	assert placeholders[1].a["href"] == "https://choosealicense.com/licenses/apache-2.0/"
+
+
+def test_manifest_disabled(tmp_pathplus: PathPlus, make_app: Callable[..., SphinxTestApp]):
+	srcdir = tmp_pathplus / "disabled"
+	_make_project(srcdir)
+	(srcdir / "api" / "packaging.rst").write_lines(["Packaging", "========="])
+
+	app = make_app("html", srcdir=path(srcdir))
+	app.build()
+
+	outdir = PathPlus(app.outdir)
+	assert not (outdir / "licenses.json").exists()
+	assert not (outdir / "_static" / "js" / "license_info.js").exists()
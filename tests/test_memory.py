@@ -0,0 +1,157 @@
+# stdlib
+import gc
+import io
+import os
+import tracemalloc
+from typing import List, NamedTuple
+
+# 3rd party
+import pytest
+from docutils.parsers.rst.states import RSTState
+from domdf_python_tools.paths import PathPlus
+from sphinx.application import Sphinx
+
+# this package
+import sphinx_licenseinfo
+
+MiB = 1024 * 1024
+
+# The test takes several minutes, so only runs when LICENSEINFO_MEMORY_TEST is set.
+# The memory measured is that allocated with a sphinx_licenseinfo frame in its traceback:
+# the peak during the build, and what is still allocated afterwards (e.g. in module-level caches).
+PROJECT_SIZE = int(os.environ.get("LICENSEINFO_MEMORY_PROJECT_SIZE", 500))
+FILE_SIZE = int(os.environ.get("LICENSEINFO_MEMORY_FILE_SIZE", 2 * MiB))
+PEAK_BUDGET = int(os.environ.get("LICENSEINFO_MEMORY_PEAK_BUDGET", 32 * MiB))
+RETAINED_BUDGET = int(os.environ.get("LICENSEINFO_MEMORY_RETAINED_BUDGET", 1 * MiB))
+TRACEBACK_LIMIT = int(os.environ.get("LICENSEINFO_MEMORY_TRACEBACK_LIMIT", 3))
+
+# Memory use must grow no faster than the size of the project, allowing for some noise.
+MAX_GROWTH = 2
+GROWTH_SLACK = 512 * 1024
+
+DIRECTIVES_PER_DOCUMENT = 50
+LICENSE_IDS = ["MIT", "Apache-2.0", "GPL-3.0", "BSD-3-Clause", "MPL-2.0", "LGPL-3.0", "Unlicense"]
+
+_package_dir = os.path.dirname(sphinx_licenseinfo.__file__) + os.sep
+
+
+class MemoryUsage(NamedTuple):
+	peak: int
+	retained: int
+	total_peak: int
+
+
+def make_project(srcdir: PathPlus, num_directives: int) -> None:
+	"""
+	Create a project with ``num_directives`` uses of :rst:dir:`license` and :rst:dir:`license-info`,
+	and a single use of a :samp:`{FILE_SIZE}` byte license file.
+	"""
+
+	srcdir.maybe_make(parents=True)
+	(srcdir / "conf.py").write_text("extensions = ['sphinx_licenseinfo']\n")
+	(srcdir / "index.rst").write_lines(["Licenses", "========", '', ".. toctree::", "\t:glob:", '', "\tdoc_*"])
+
+	line = "Permission is hereby granted, free of charge, to any person obtaining a copy of this software.\n"
+	(srcdir / "LARGE_LICENSE").write_text(line * (FILE_SIZE // len(line)))
+
+	for docnum in range(-(-num_directives // DIRECTIVES_PER_DOCUMENT)):
+		content = [f"Document {docnum}", "==========", '']
+
+		if docnum == 0:
+			content.extend([".. license::", "\t:file: LARGE_LICENSE", ''])
+
+		start = docnum * DIRECTIVES_PER_DOCUMENT
+		for idx in range(start, min(start + DIRECTIVES_PER_DOCUMENT, num_directives)):
+			if idx % 10 == 0:
+				content.extend([".. license::", "\t:py: sphinx", ''])
+			else:
+				content.extend([f".. license-info:: {LICENSE_IDS[idx % len(LICENSE_IDS)]}", ''])
+
+		(srcdir / f"doc_{docnum}.rst").write_lines(content)
+
+
+def attributed_memory() -> int:
+	"""
+	Returns the size of the traced allocations with a :mod:`sphinx_licenseinfo` frame in their traceback.
+	"""
+
+	snapshot = tracemalloc.take_snapshot()
+	total = 0
+
+	for stat in snapshot.statistics("traceback"):
+		if any(frame.filename.startswith(_package_dir) for frame in stat.traceback):
+			total += stat.size
+
+	return total
+
+
+def measure_build(root: PathPlus, num_directives: int, trace: bool = True) -> MemoryUsage:
+	srcdir = root / "src"
+	make_project(srcdir, num_directives)
+
+	app = Sphinx(
+			srcdir,
+			srcdir,
+			root / "build" / "html",
+			root / "build" / "doctrees",
+			"html",
+			status=None,
+			warning=io.StringIO(),
+			freshenv=True,
+			)
+
+	if not trace:
+		app.build()
+		return MemoryUsage(0, 0, 0)
+
+	samples: List[int] = []
+	app.connect("doctree-read", lambda *args: samples.append(attributed_memory()))
+	app.connect("env-updated", lambda *args: samples.append(attributed_memory()))
+	app.connect("build-finished", lambda *args: samples.append(attributed_memory()))
+
+	tracemalloc.start(TRACEBACK_LIMIT)
+	try:
+		app.build()
+		assert app.statuscode == 0, app._warning.getvalue()  # type: ignore[attr-defined]
+
+		# Sphinx keeps the last document it wrote, so only measure what outlives the application.
+		# docutils also caches state machines (which refer to the last document parsed) on the RSTState class.
+		del app
+		RSTState.nested_sm_cache.clear()
+		gc.collect()
+		retained = attributed_memory()
+		_, total_peak = tracemalloc.get_traced_memory()
+	finally:
+		tracemalloc.stop()
+
+	return MemoryUsage(peak=max(samples), retained=retained, total_peak=total_peak)
+
+
+@pytest.mark.skipif(
+		not os.environ.get("LICENSEINFO_MEMORY_TEST"),
+		reason="Set LICENSEINFO_MEMORY_TEST to run the memory budget test.",
+		)
+@pytest.mark.usefixtures("fake_virtualenv")
+def test_memory_budget(tmp_pathplus: PathPlus, monkeypatch):
+	monkeypatch.delenv("SPHINX_LICENSEINFO_CACHE_DIR", raising=False)
+
+	# Populate caches which last for the whole process (e.g. the parsed choosealicense.com licenses),
+	# so they are not counted against the first project.
+	measure_build(tmp_pathplus / "warmup", len(LICENSE_IDS) * 10, trace=False)
+
+	small = measure_build(tmp_pathplus / "small", PROJECT_SIZE)
+	large = measure_build(tmp_pathplus / "large", PROJECT_SIZE * 2)
+
+	def describe(size: int, usage: MemoryUsage) -> str:
+		return (
+				f"{size} directives: peak {usage.peak / MiB:.1f} MiB, retained {usage.retained / MiB:.1f} MiB "
+				f"(total peak including Sphinx {usage.total_peak / MiB:.1f} MiB)"
+				)
+
+	summary = f"{describe(PROJECT_SIZE, small)}; {describe(PROJECT_SIZE * 2, large)}"
+
+	assert large.peak <= PEAK_BUDGET, summary
+	assert large.retained <= RETAINED_BUDGET, summary
+
+	assert large.peak <= small.peak * MAX_GROWTH + GROWTH_SLACK, summary
+	assert large.retained <= small.retained * MAX_GROWTH + GROWTH_SLACK, summary
@@ -1,11 +1,12 @@
 # stdlib
 import shutil
-from typing import Iterator, cast
+import subprocess
+import time
+from typing import Callable, Iterator, List, Tuple, cast
 
 # 3rd party
 import bs4.element
 import docutils
-import handy_archives
 import pychoosealicense as pychoosealicense
 import pytest
 import sphinx
@@ -18,6 +19,8 @@ from importlib_resources import files
 from importlib_resources.abc import Traversable
 from sphinx.application import Sphinx
 from sphinx.builders import Builder
+from sphinx.testing.path import path
+from sphinx.testing.util import SphinxTestApp
 from sphinx_toolbox.testing import HTMLRegressionFixture, LaTeXRegressionFixture
 
 
@@ -28,51 +31,6 @@ def iter_licenses() -> Iterator[pychoosealicense.License]:
 			yield pychoosealicense.get_license(license_file.name[:-4])
 
 
-@pytest.fixture()
-def doc_root(tmp_pathplus: PathPlus) -> None:
-	doc_root = tmp_pathplus.parent / "test-sphinx-licenseinfo"
-	doc_root.maybe_make()
-	(doc_root / "conf.py").write_lines([
-			"extensions = ['sphinx_licenseinfo']",
-			"toml_spec_version = '0.5.0'",
-			])
-
-	shutil.copy2(PathPlus(__file__).parent / "index.rst", doc_root / "index.rst")
-
-	examples_dir = doc_root / "examples"
-	examples_dir.maybe_make()
-
-
-_original_wheel_directory = PathPlus(__file__).parent / "wheels"
-
-
-@pytest.fixture(scope="session")
-def wheel_directory() -> PathPlus:
-	return _original_wheel_directory
-
-
-@pytest.fixture()
-def fake_virtualenv(
-		wheel_directory: PathPlus,
-		tmp_pathplus: PathPlus,
-		monkeypatch,
-		) -> None:
-
-	site_packages = (tmp_pathplus / "python3.8" / "site-packages")
-
-	site_packages.mkdir(parents=True)
-
-	for filename in [
-			"Sphinx-3.5.4-py3-none-any.whl",
-			"packaging-21.0-py3-none-any.whl",
-			"CacheControl-0.12.6-py2.py3-none-any.whl",
-			]:
-
-		handy_archives.unpack_archive(str(wheel_directory / filename), site_packages)
-
-	monkeypatch.syspath_prepend(str(site_packages))
-
-
 @pytest.mark.usefixtures("doc_root")
 @pytest.mark.sphinx("html", testroot="test-sphinx-licenseinfo")
 def test_build_example(app: Sphinx):
@@ -186,8 +144,10 @@ def test_html_output_problematic(
 
 	expeted_warnings = [
 			"problematic.rst:7: WARNING: '.. license::' requires exactly one option, got 0",
-			"problematic.rst:9: WARNING: Found more than one file matching the pattern 'LICEN[CS]E*' "
-			"for distribution 'packaging' version 21.0\n(['LICENSE', 'LICENSE.APACHE', 'LICENSE.BSD'])\nUsing the first one.",
+			"problematic.rst:9: WARNING: Distribution 'packaging' version 21.0 "
+			"declares more than one license file\n"
+			"(['LICENSE', 'LICENSE.APACHE', 'LICENSE.BSD'])\n"
+			"Using the first one. Use the ':all:' option to show all of them.",
 			"problematic.rst:12: WARNING: No 'LICENSE' file (or similar) found for distribution 'CacheControl' version 0.12.6",
 			]
 
@@ -244,3 +204,98 @@ def test_latex_output(
 	output_file = PathPlus(app.outdir) / "python.tex"
 
 	latex_regression.check(StringList(output_file.read_lines()), jinja2=True)
+
+
+def _build_many_licenses(srcdir: PathPlus, make_app: Callable[..., SphinxTestApp]) -> Tuple[Sphinx, List[str]]:
+	"""
+	Build a document with 300 :rst:dir:`license-info` directives, using each license several times.
+
+	Returns the application, and the SPDX identifiers of the licenses in the order they appear in the document.
+	"""
+
+	licenses = sorted(lic.spdx_id for lic in iter_licenses())
+	uses = [licenses[i % len(licenses)] for i in range(300)]
+
+	content = [":orphan:", '', "Licenses", "========", '']
+	for spdx_id in uses:
+		content.extend([f".. license-info:: {spdx_id}", ''])
+
+	(srcdir / "many_licenses.rst").write_lines(content)
+
+	app = make_app(
+			"latex",
+			srcdir=path(srcdir),
+			confoverrides={
+					"latex_documents": [("many_licenses", "many_licenses.tex", "Licenses", "Author", "manual")],
+					},
+			)
+	app.build()
+
+	return app, uses
+
+
+def test_latex_license_macros(project_dir: PathPlus, make_app: Callable[..., SphinxTestApp]):
+	app, uses = _build_many_licenses(project_dir, make_app)
+
+	output_file = PathPlus(app.outdir) / "many_licenses.tex"
+	preamble, body = output_file.read_text().split("\\begin{document}")
+
+	# Each license is defined once, in the preamble, and used once per directive.
+	for spdx_id in set(uses):
+		macro = f"\\csname sphinxlicenseinfo@{spdx_id.lower()}\\endcsname"
+		assert preamble.count(macro) == 1
+		assert body.count(f"\n{macro}\n") == uses.count(spdx_id)
+
+	assert "\\begin{itemize}" not in body
+	assert "\\vspace{10px}" not in body
+	assert body.count("\\begin{flushright}") == 300
+
+
+@pytest.mark.skipif(shutil.which("pdflatex") is None, reason="Requires pdflatex")
+def test_latex_license_macros_compile(project_dir: PathPlus, make_app: Callable[..., SphinxTestApp]):
+	app, uses = _build_many_licenses(project_dir, make_app)
+
+	start = time.perf_counter()
+	for _ in range(2):  # The second run uses the index and table of contents from the first
+		process = subprocess.run(
+				["pdflatex", "-interaction=nonstopmode", "-halt-on-error", "many_licenses.tex"],
+				cwd=app.outdir,
+				stdout=subprocess.PIPE,
+				stderr=subprocess.STDOUT,
+				)
+		assert process.returncode == 0, process.stdout.decode("UTF-8", errors="replace")[-2000:]
+
+	elapsed = time.perf_counter() - start
+	assert elapsed < 120, f"Compiled {len(uses)} license blocks in {elapsed:.2f}s"
+
+
+@pytest.mark.usefixtures("fake_virtualenv")
+def test_declared_license_files(project_dir: PathPlus, make_app: Callable[..., SphinxTestApp]):
+	(project_dir / "license_files.rst").write_lines([
+			":orphan:",
+			'',
+			"License Files",
+			"=============",
+			'',
+			".. license::",
+			"\t:py: hatch",
+			'',
+			".. license::",
+			"\t:py: packaging",
+			"\t:all:",
+			])
+
+	app = make_app("html", srcdir=path(project_dir))
+	app.build()
+
+	capout = strip_ansi(app._warning.getvalue())  # type: ignore[attr-defined]
+	assert "license_files.rst" not in capout
+
+	page = BeautifulSoup((PathPlus(app.outdir) / "license_files.html").read_text(), "html5lib")
+	code_blocks = page.select("div.body pre")
+	assert len(code_blocks) == 4
+	assert "MIT License" in code_blocks[0].text
+
+	captions = [caption.text.strip() for caption in page.select("div.body .code-block-caption .caption-text")]
+	assert captions == ["LICENSE", "LICENSE.APACHE", "LICENSE.BSD"]
+	assert "Apache License" in code_blocks[2].text
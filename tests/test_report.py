@@ -0,0 +1,114 @@
+# stdlib
+import json
+
+# 3rd party
+import pytest
+from consolekit.testing import CliRunner, Result
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from sphinx_licenseinfo.__main__ import main
+from sphinx_licenseinfo.cache import LicenseCache
+from sphinx_licenseinfo.report import check_licenses, gather_report, read_requirement_names
+
+
+@pytest.fixture()
+def site_packages(fake_virtualenv, tmp_pathplus: PathPlus) -> str:
+	return str(tmp_pathplus / "python3.8" / "site-packages")
+
+
+def test_read_requirement_names(tmp_pathplus: PathPlus):
+	(tmp_pathplus / "requirements.txt").write_lines([
+			"# A comment",
+			"--index-url https://example.com/simple",
+			"-r other.txt",
+			'',
+			"Sphinx>=3.2.0",
+			"packaging[extra] ; python_version >= '3.7'  # Another comment",
+			"CacheControl",
+			])
+
+	assert read_requirement_names(tmp_pathplus / "requirements.txt") == ["Sphinx", "packaging", "CacheControl"]
+
+
+def test_gather_report(site_packages: str, tmp_pathplus: PathPlus):
+	report = gather_report(["sphinx", "Packaging", "packaging", "not-installed"], path=[site_packages])
+
+	assert [(d.name, d.version, d.license) for d in report.distributions] == [
+			("packaging", "21.0", "Apache-2.0"),
+			("Sphinx", "3.5.4", None),
+			]
+	assert report.distributions[1].license_files[0][0] == "LICENSE"
+	assert list(report.licenses) == ["Apache-2.0"]
+	assert report.missing == ["not-installed"]
+
+	# All distributions on the path, reusing the cache
+	cache = LicenseCache(tmp_pathplus / "cache")
+	for _ in range(2):
+		report = gather_report(path=[site_packages], cache=cache, jobs=2)
+		assert [d.name for d in report.distributions] == ["CacheControl", "packaging", "Sphinx"]
+		assert report.missing == []
+
+
+def test_check_licenses(site_packages: str):
+	report = gather_report(path=[site_packages])
+
+	assert check_licenses(report) == []
+	assert check_licenses(report, disallow_copyleft=True) == []
+
+	violations = check_licenses(report, disallow=["apache-2.0"], disallow_unknown=True)
+	assert [(d.name, reason) for d, reason in violations] == [
+			("CacheControl", "Apache-2.0 is not allowed"),
+			("packaging", "Apache-2.0 is not allowed"),
+			("Sphinx", "license could not be determined"),
+			]
+
+
+def test_cli_text(site_packages: str):
+	runner = CliRunner()
+
+	result: Result = runner.invoke(main, args=["--path", site_packages, "packaging", "CacheControl"])
+	assert result.exit_code == 0
+	assert result.stdout.splitlines() == [
+			"CacheControl 0.12.6: Apache-2.0 (no license files)",
+			"packaging 21.0: Apache-2.0 (LICENSE, LICENSE.APACHE, LICENSE.BSD)",
+			]
+
+	result = runner.invoke(main, args=["--path", site_packages, "--disallow", "Apache-2.0", "packaging", "foo"])
+	assert result.exit_code == 1
+	assert result.stdout.splitlines() == [
+			"packaging 21.0: Apache-2.0 (LICENSE, LICENSE.APACHE, LICENSE.BSD)",
+			"foo: distribution not found",
+			"Disallowed: packaging 21.0: Apache-2.0 is not allowed",
+			]
+
+
+def test_cli_json(site_packages: str, tmp_pathplus: PathPlus):
+	(tmp_pathplus / "requirements.txt").write_lines(["Sphinx==3.5.4"])
+
+	result: Result = CliRunner().invoke(
+			main,
+			args=["--path", site_packages, "-r", str(tmp_pathplus / "requirements.txt"), "--format", "json"],
+			)
+	assert result.exit_code == 0
+
+	data = json.loads(result.stdout)
+	assert [d["name"] for d in data["distributions"]] == ["Sphinx"]
+	assert data["distributions"][0]["license_files"][0]["text"].startswith("License for Sphinx")
+	assert data["violations"] == []
+
+
+def test_cli_html(site_packages: str, tmp_pathplus: PathPlus):
+	output = tmp_pathplus / "report.html"
+
+	result: Result = CliRunner().invoke(
+			main,
+			args=["--path", site_packages, "--format", "html", "--output", str(output), "packaging"],
+			)
+	assert result.exit_code == 0
+	assert result.stdout == ''
+
+	content = output.read_text()
+	assert '<h3 id="license-apache-2.0">Apache License 2.0</h3>' in content
+	assert '<div class="license-info">' in content
+	assert "<h3>packaging 21.0</h3>" in content
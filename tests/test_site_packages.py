@@ -0,0 +1,133 @@
+# stdlib
+from typing import Callable
+
+# 3rd party
+import handy_archives
+import pytest
+from bs4 import BeautifulSoup
+from consolekit.terminal_colours import strip_ansi
+from dist_meta.distributions import DistributionNotFoundError
+from domdf_python_tools.paths import PathPlus
+from sphinx.testing.path import path
+from sphinx.testing.util import SphinxTestApp
+
+# this package
+from sphinx_licenseinfo import utils
+from sphinx_licenseinfo.utils import find_distribution, get_distribution_index, get_site_packages
+from sphinx_licenseinfo.validate import Reference, iter_references
+
+wheels_dir = PathPlus(__file__).parent / "wheels"
+
+
+def make_venv(venv: PathPlus, *wheels: str) -> PathPlus:
+	site_packages = venv / "lib" / "python3.8" / "site-packages"
+	site_packages.maybe_make(parents=True)
+
+	for wheel in wheels:
+		handy_archives.unpack_archive(str(wheels_dir / wheel), site_packages)
+
+	return site_packages
+
+
+def test_distribution_index(tmp_pathplus: PathPlus, monkeypatch):
+	site_packages = make_venv(tmp_pathplus / "venv", "packaging-21.0-py3-none-any.whl")
+
+	calls = []
+	iter_distributions = utils.iter_distributions
+	monkeypatch.setattr(utils, "iter_distributions", lambda path: calls.append(path) or iter_distributions(path))
+
+	assert find_distribution("packaging", [site_packages]).name == "packaging"
+	assert find_distribution("PACKAGING", [site_packages]).name == "packaging"
+	with pytest.raises(DistributionNotFoundError):
+		find_distribution("Sphinx", [site_packages])
+	assert len(calls) == 1
+
+	assert list(get_distribution_index(site_packages)) == ["packaging"]
+	assert get_distribution_index(tmp_pathplus / "does-not-exist") == {}
+
+	# Rescanned when a distribution is installed
+	handy_archives.unpack_archive(str(wheels_dir / "Sphinx-3.5.4-py3-none-any.whl"), site_packages)
+	assert find_distribution("sphinx", [site_packages]).name == "Sphinx"
+	assert len(calls) == 2
+
+	assert get_site_packages(tmp_pathplus / "venv") == [site_packages]
+	with pytest.raises(FileNotFoundError, match="No 'site-packages' directory found in"):
+		get_site_packages(tmp_pathplus)
+
+
+def test_iter_references_site_packages():
+	source = '\n'.join([
+			".. license::",
+			"\t:venv: envs/prod",
+			"\t:py: hatch",
+			'',
+			".. license::",
+			"\t:py: packaging",
+			"\t:site-packages: envs/site-packages",
+			])
+
+	assert list(iter_references(source)) == [
+			Reference(3, "py", "hatch", None, "envs/prod"),
+			Reference(6, "py", "packaging", "envs/site-packages", None),
+			]
+
+
+def test_site_packages_directive(tmp_pathplus: PathPlus, make_app: Callable[..., SphinxTestApp]):
+	srcdir = tmp_pathplus / "site_packages"
+	srcdir.maybe_make()
+	(srcdir / "conf.py").write_lines([
+			"extensions = ['sphinx_licenseinfo']",
+			"licenseinfo_validate = True",
+			"licenseinfo_site_packages = ['envs/default/lib/python3.8/site-packages']",
+			])
+
+	make_venv(srcdir / "envs" / "prod", "Sphinx-3.5.4-py3-none-any.whl")
+	make_venv(srcdir / "envs" / "other", "packaging-21.0-py3-none-any.whl")
+	make_venv(srcdir / "envs" / "default", "CacheControl-0.12.6-py2.py3-none-any.whl")
+
+	(srcdir / "index.rst").write_lines([
+			"Environments",
+			"============",
+			'',
+			".. license::",
+			"\t:py: sphinx",
+			"\t:venv: envs/prod",
+			'',
+			".. license::",
+			"\t:py: packaging",
+			"\t:site-packages: envs/other/lib/python3.8/site-packages",
+			"\t:all:",
+			'',
+			".. license::",
+			"\t:py: packaging",
+			"\t:venv: envs",
+			'',
+			".. license::",
+			"\t:venv: envs/prod",
+			"\t:file: conf.py",
+			'',
+			".. license::",
+			"\t:py: cachecontrol",
+			])
+
+	app = make_app("html", srcdir=path(srcdir))
+	app.build()
+
+	page = BeautifulSoup((PathPlus(app.outdir) / "index.html").read_text(), "html5lib")
+	code_blocks = page.select("div.body pre")
+	assert code_blocks[0].text.startswith("License for Sphinx")
+	assert [caption.text for caption in page.select("div.body .caption-text")] == [
+			"LICENSE",
+			"LICENSE.APACHE",
+			"LICENSE.BSD",
+			]
+
+	warnings = strip_ansi(app._warning.getvalue())  # type: ignore[attr-defined]
+	assert "index.rst:13: WARNING: No 'site-packages' directory found in" in warnings
+	assert "index.rst:17: WARNING: The ':site-packages:' and ':venv:' options can only be used with ':py:'" in (
+			warnings
+			)
+	assert "is not installed" not in warnings
+
+	# Found in licenseinfo_site_packages, but it has no license files.
+	assert "No 'LICENSE' file (or similar) found for distribution 'CacheControl' version 0.12.6" in warnings
@@ -0,0 +1,95 @@
+# stdlib
+from typing import Callable
+
+# 3rd party
+import pytest
+from consolekit.terminal_colours import strip_ansi
+from domdf_python_tools.paths import PathPlus
+from sphinx.testing.path import path
+from sphinx.testing.util import SphinxTestApp
+
+# this package
+from sphinx_licenseinfo.validate import LicenseValidationError, Reference, iter_references, validate_references
+
+source = '\n'.join([
+		"Title",
+		"=====",
+		'',
+		".. license-info:: MIT",
+		'',
+		".. license::",
+		"\t:py: hatch",
+		"\t:all:",
+		'',
+		"The :choosealicense:`Apache-2.0` and :choosealicense:`the GPL <gpl-3.0>` licenses.",
+		'',
+		"Example::",
+		'',
+		"\t.. license-info:: NOT-IN-LITERAL",
+		'',
+		".. code-block:: rst",
+		'',
+		"\t:choosealicense:`NOT-IN-CODE`",
+		'',
+		"..",
+		"\t.. license-info:: NOT-IN-COMMENT",
+		'',
+		r"Not a role: \:choosealicense:`NOT-A-ROLE` or ``:choosealicense:`NOT-A-ROLE```.",
+		'',
+		".. note::",
+		'',
+		"\t.. license-info:: BSD-3-Clause",
+		])
+
+
+def test_iter_references():
+	assert list(iter_references(source)) == [
+			Reference(4, "license-info", "MIT"),
+			Reference(7, "py", "hatch"),
+			Reference(10, "choosealicense", "Apache-2.0"),
+			Reference(10, "choosealicense", "gpl-3.0"),
+			Reference(27, "license-info", "BSD-3-Clause"),
+			]
+
+
+def _write_bad_document(srcdir: PathPlus) -> None:
+	(srcdir / "validate.rst").write_lines([
+			":orphan:",
+			'',
+			"Validate",
+			"========",
+			'',
+			".. license-info:: MTI",
+			'',
+			".. license::",
+			"\t:py: not-a-real-distribution",
+			'',
+			"See :choosealicense:`gpl-3.0` and :choosealicense:`the Apache <apache-3.0>`.",
+			])
+
+
+def test_validate_warnings(project_dir: PathPlus, make_app: Callable[..., SphinxTestApp]):
+	_write_bad_document(project_dir)
+
+	app = make_app("html", srcdir=path(project_dir), confoverrides={"licenseinfo_validate": True})
+	validate_references(app, app.env, ["validate"])
+
+	warnings = strip_ansi(app._warning.getvalue())  # type: ignore[attr-defined]
+	assert "validate.rst:6: WARNING: Unknown license 'MTI'" in warnings
+	assert "validate.rst:9: WARNING: Distribution 'not-a-real-distribution' is not installed" in warnings
+	assert "validate.rst:11: WARNING: Unknown license 'apache-3.0'" in warnings
+	assert "gpl-3.0" not in warnings
+
+
+def test_validate_strict(project_dir: PathPlus, make_app: Callable[..., SphinxTestApp]):
+	_write_bad_document(project_dir)
+
+	app = make_app("html", srcdir=path(project_dir), confoverrides={"licenseinfo_validate": "strict"})
+	with pytest.raises(LicenseValidationError) as e:
+		app.build()
+
+	lines = str(e.value).splitlines()
+	assert len(lines) == 3
+	assert lines[0].endswith("validate.rst:6: Unknown license 'MTI'")
+	assert lines[1].endswith("validate.rst:9: Distribution 'not-a-real-distribution' is not installed")
+	assert lines[2].endswith("validate.rst:11: Unknown license 'apache-3.0'")